@@ -0,0 +1,280 @@
+"""
+Persisted archetype classifier and batch inference.
+
+An ArchetypeModel bundles everything predictions need: the fitted sklearn
+pipeline (scaler included for the logistic regression), its feature
+columns, and the label encoder that maps class indices back to archetype
+names. It is trained once, pickled to MODEL_PATH, and warm-loaded once per
+process by load_model(); scoring never retrains.
+
+predict_archetypes() scores a character stats table in fixed-size chunks
+(one vectorized predict_proba per chunk). Raw play XML goes through
+character_features_from_xml() first, which reuses the PlayBundle cache.
+
+    python archetype_model.py train --kind rf
+    python archetype_model.py train --search-results ../csv/model_search_results.csv
+    python archetype_model.py predict --stats ../csv/all_plays_char_stats.csv --out preds.csv
+    python archetype_model.py predict --xml macbeth.xml hamlet.xml --out preds.csv
+"""
+import argparse
+import os
+import pickle
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from centrality import CENTRALITY_COLUMNS, drop_isolated, play_centrality_frame
+from dynamics import DYNAMICS_COLUMNS, add_dynamics_features, play_dynamics_frame
+from eda_utils import (
+    DEFAULT_CHUNK_ROWS, PLAY_CACHE_DIR, CooccurrenceNetwork, PlayCorpus, extract_speeches_and_lines_by_scene
+)
+from model_search import FEATURE_SETS, best_estimator, load_training_frame
+from stylometry import STYLOMETRY_COLUMNS, add_stylometry_features, character_stylometry
+from temporal_networks import TEMPORAL_COLUMNS, TemporalNetwork, add_temporal_features
+
+MODEL_DIR = os.path.join(PLAY_CACHE_DIR, "models")
+MODEL_PATH = os.path.join(MODEL_DIR, "archetype_model.pkl")
+
+# the two classifiers of base_models.ipynb (rf_feature_cols / lg_feature_cols)
+NOTEBOOK_MODELS = {
+    "rf": (
+        FEATURE_SETS["rf"],
+        RandomForestClassifier(n_estimators=300, class_weight="balanced", random_state=42, max_depth=5),
+    ),
+    "lg": (
+        FEATURE_SETS["lg"],
+        make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000, class_weight="balanced")),
+    ),
+}
+
+
+class ArchetypeModel:
+    """Fitted pipeline + feature columns + label encoder, saved and loaded as one pickle."""
+
+    def __init__(self, pipeline, feature_cols, label_encoder, info=None):
+        self.pipeline = pipeline
+        self.feature_cols = list(feature_cols)
+        self.label_encoder = label_encoder
+        self.info = info or {}
+
+    @property
+    def classes(self):
+        return list(self.label_encoder.classes_)
+
+    @property
+    def needs_centrality(self) -> bool:
+        return any(c in CENTRALITY_COLUMNS for c in self.feature_cols)
+
+    @property
+    def needs_dynamics(self) -> bool:
+        return any(c in DYNAMICS_COLUMNS for c in self.feature_cols)
+
+    @property
+    def needs_stylometry(self) -> bool:
+        return any(c in STYLOMETRY_COLUMNS for c in self.feature_cols)
+
+    @property
+    def needs_temporal(self) -> bool:
+        return any(c in TEMPORAL_COLUMNS for c in self.feature_cols)
+
+    def save(self, path=MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with open(path, "rb") as fh:
+            model = pickle.load(fh)
+        if not isinstance(model, cls):
+            raise TypeError(f"{path} does not hold an ArchetypeModel")
+        return model
+
+    def feature_matrix(self, characters_df) -> np.ndarray:
+        """The model's feature columns as a float matrix (NaN -> 0, as in training)."""
+        missing = [c for c in self.feature_cols if c not in characters_df.columns]
+        if missing:
+            raise ValueError(f"Character table is missing feature columns: {', '.join(missing)}")
+        return characters_df[self.feature_cols].fillna(0).to_numpy(dtype=np.float64)
+
+    def predict(self, characters_df, chunk_rows=DEFAULT_CHUNK_ROWS, proba=False) -> pd.DataFrame:
+        """
+        One row per input row: play / character (when present),
+        predicted_archetype and its probability as confidence. With
+        proba=True, every class probability is added as p_<archetype>.
+        """
+        X = self.feature_matrix(characters_df)
+        probs = np.empty((len(X), len(self.classes)), dtype=np.float64)
+        for start in range(0, len(X), chunk_rows):
+            probs[start:start + chunk_rows] = self.pipeline.predict_proba(X[start:start + chunk_rows])
+
+        best = probs.argmax(axis=1)
+        out = characters_df[[c for c in ("play", "character") if c in characters_df.columns]].reset_index(drop=True)
+        out["predicted_archetype"] = self.label_encoder.inverse_transform(best)
+        out["confidence"] = probs[np.arange(len(best)), best]
+        if proba:
+            out = pd.concat([out, pd.DataFrame(probs, columns=[f"p_{c}" for c in self.classes])], axis=1)
+        return out
+
+
+# -----------------------
+# Training
+# -----------------------
+def train_archetype_model(kind="rf", results=None, df=None, label_col="campbell_archetype", csv_dir="../csv") -> ArchetypeModel:
+    """
+    Fit an ArchetypeModel on every labelled character. `kind` picks one of
+    NOTEBOOK_MODELS; pass a model_search() result as `results` to use its
+    best configuration instead.
+    """
+    if df is None:
+        df = load_training_frame(csv_dir)
+    if results is not None:
+        estimator, cols = best_estimator(results)
+        kind = f"{results.iloc[0]['feature_set']}/{results.iloc[0]['model']}"
+    else:
+        cols, estimator = NOTEBOOK_MODELS[kind]
+        estimator = clone(estimator)
+
+    le = LabelEncoder().fit(df[label_col])
+    estimator.fit(df[cols].fillna(0).to_numpy(dtype=np.float64), le.transform(df[label_col]))
+    info = {
+        "kind": kind,
+        "trained_rows": len(df),
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    return ArchetypeModel(estimator, cols, le, info)
+
+
+# -----------------------
+# Inference
+# -----------------------
+_LOADED = {}
+
+
+def load_model(path=MODEL_PATH) -> ArchetypeModel:
+    """ArchetypeModel at `path`, unpickled once per process (reloaded only if the file changes)."""
+    mtime = os.path.getmtime(path)
+    cached = _LOADED.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _LOADED[path] = (mtime, ArchetypeModel.load(path))
+    return cached[1]
+
+
+def character_features_from_xml(
+    sources, centrality=False, dynamics=False, stylometry=False, temporal=False, workers=1,
+    cache_dir=PLAY_CACHE_DIR
+) -> pd.DataFrame:
+    """
+    Character stats (the all_plays_char_stats.csv columns) for raw play XML
+    paths or trees, through the PlayBundle cache. With centrality=True the
+    CENTRALITY_COLUMNS are computed from each play's co-occurrence network,
+    with dynamics=True the DYNAMICS_COLUMNS from its speeches, with
+    stylometry=True the STYLOMETRY_COLUMNS from its lines and with
+    temporal=True the TEMPORAL_COLUMNS from its act-by-act networks.
+    """
+    corpus = PlayCorpus(sources, cache_dir=cache_dir)
+    corpus.prepare(workers)
+    frames = []
+    for bundle in corpus:
+        char_df = bundle.summary["character_df"]
+        if centrality:
+            net = CooccurrenceNetwork.from_merged(bundle.merged)
+            # characters without partners are left out, as in the _network.csv training used
+            cent = play_centrality_frame(bundle.title, *drop_isolated(net.characters, *net.edges()))
+            char_df = char_df.merge(cent, on=["play", "character"], how="left")
+            char_df[CENTRALITY_COLUMNS] = char_df[CENTRALITY_COLUMNS].fillna(0)
+        if dynamics or stylometry or temporal:
+            speeches_df, lines_df = extract_speeches_and_lines_by_scene(bundle.source)
+            if dynamics:
+                char_df = add_dynamics_features(char_df, play_dynamics_frame(speeches_df))
+            if stylometry:
+                char_df = add_stylometry_features(char_df, character_stylometry(lines_df))
+            if temporal:
+                char_df = add_temporal_features(char_df, TemporalNetwork.from_speeches(speeches_df).table())
+        frames.append(char_df)
+        bundle.release()
+    return pd.concat(frames, ignore_index=True)
+
+
+def predict_archetypes(characters_df, model=None, model_path=MODEL_PATH, chunk_rows=DEFAULT_CHUNK_ROWS, proba=False) -> pd.DataFrame:
+    """
+    Predicted archetype for every row of a character stats table, using
+    `model` or the warm-loaded model at model_path. See ArchetypeModel.predict.
+    """
+    if model is None:
+        model = load_model(model_path)
+    return model.predict(characters_df, chunk_rows=chunk_rows, proba=proba)
+
+
+def predict_archetypes_csv(stats_path, out_path, model=None, model_path=MODEL_PATH, chunk_rows=DEFAULT_CHUNK_ROWS, proba=False) -> int:
+    """
+    Stream a character stats CSV through the model chunk by chunk and
+    append predictions to out_path, so memory stays bounded however large
+    the table is. Returns the number of rows scored.
+    """
+    if model is None:
+        model = load_model(model_path)
+    rows = 0
+    for i, chunk in enumerate(pd.read_csv(stats_path, chunksize=chunk_rows)):
+        preds = model.predict(chunk, chunk_rows=chunk_rows, proba=proba)
+        preds.to_csv(out_path, index=False, mode="w" if i == 0 else "a", header=i == 0)
+        rows += len(preds)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train = sub.add_parser("train", help="fit and save the archetype model")
+    train.add_argument("--kind", choices=sorted(NOTEBOOK_MODELS), default="rf")
+    train.add_argument("--search-results", help="model_search.py output; trains its best configuration")
+    train.add_argument("--csv-dir", default="../csv")
+    train.add_argument("--model", default=MODEL_PATH)
+
+    predict = sub.add_parser("predict", help="score characters with the saved model")
+    source = predict.add_mutually_exclusive_group(required=True)
+    source.add_argument("--stats", help="character stats CSV (all_plays_char_stats.csv layout)")
+    source.add_argument("--xml", nargs="+", help="raw play XML files")
+    predict.add_argument("--model", default=MODEL_PATH)
+    predict.add_argument("--out", default="archetype_predictions.csv")
+    predict.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    predict.add_argument("--proba", action="store_true", help="also write per-class probabilities")
+    predict.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        results = pd.read_csv(args.search_results) if args.search_results else None
+        model = train_archetype_model(args.kind, results=results, csv_dir=args.csv_dir)
+        model.save(args.model)
+        print(f"Saved {model.info['kind']} archetype model ({model.info['trained_rows']} rows): {args.model}")
+        return
+
+    model = load_model(args.model)
+    if args.stats:
+        rows = predict_archetypes_csv(args.stats, args.out, model=model, chunk_rows=args.chunk_rows, proba=args.proba)
+    else:
+        characters = character_features_from_xml(
+            args.xml, centrality=model.needs_centrality, dynamics=model.needs_dynamics,
+            stylometry=model.needs_stylometry, temporal=model.needs_temporal, workers=args.workers,
+        )
+        preds = predict_archetypes(characters, model=model, chunk_rows=args.chunk_rows, proba=args.proba)
+        preds.to_csv(args.out, index=False)
+        rows = len(preds)
+    print(f"Saved {rows} archetype predictions: {args.out}")
+
+
+if __name__ == "__main__":
+    # run the imported module's main so saved models pickle as archetype_model.ArchetypeModel,
+    # not __main__.ArchetypeModel (which nothing else can load)
+    from archetype_model import main
+    main()
@@ -0,0 +1,218 @@
+"""
+Benchmarks for the eda_utils pipeline on synthetic corpora.
+
+Generates Shakespeare-schema XML plays (PLAY / PERSONAE / ACT / SCENE /
+SPEECH / SPEAKER / LINE) with a tunable cast size, scene count and speech
+length, then times and memory-profiles each stage at several corpus sizes.
+Results go to a JSON file so runs can be compared over time.
+
+    python benchmark.py --scales 1 10 100 --out ../bench_results.json
+
+Scale 1 is 8 plays (the size of the NLTK corpus); scale 10 is 80 plays, etc.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+import eda_utils
+from eda_utils.cli import STARTUP_BUDGET_S, check_startup
+
+BASE_PLAYS = 8
+
+_WORDS = (
+    "love death night king lord good sweet heaven blood heart fair eyes hand "
+    "time life man world soul honour grace sleep fear crown sword truth fool "
+    "thou thee thy art hath doth shall would might noble gentle brave cruel"
+).split()
+
+
+# -----------------------
+# Synthetic plays
+# -----------------------
+def generate_play(
+    title: str,
+    cast_size: int = 30,
+    acts: int = 5,
+    scenes_per_act: int = 5,
+    speeches_per_scene: int = 45,
+    lines_per_speech: int = 4,
+    seed: int = 0
+) -> str:
+    """
+    XML text of a synthetic play in the NLTK Shakespeare schema. Speakers
+    are drawn with a skewed distribution so a few characters dominate, and
+    speech lengths vary around lines_per_speech.
+    """
+    rng = random.Random(seed)
+    cast = [f"CHARACTER {i}" for i in range(cast_size)]
+    weights = [1 / (i + 1) for i in range(cast_size)]
+
+    out = ["<?xml version=\"1.0\"?>", "<PLAY>", f"<TITLE>{escape(title)}</TITLE>"]
+    out.append("<PERSONAE><TITLE>Dramatis Personae</TITLE>")
+    for i, name in enumerate(cast):
+        out.append(f"<PERSONA>{name}, role number {i}.</PERSONA>")
+    out.append("</PERSONAE>")
+
+    for act_i in range(1, acts + 1):
+        out.append(f"<ACT><TITLE>ACT {act_i}</TITLE>")
+        for scene_i in range(1, scenes_per_act + 1):
+            out.append(f"<SCENE><TITLE>SCENE {scene_i}</TITLE><STAGEDIR>Enter</STAGEDIR>")
+            present = rng.sample(cast, k=min(cast_size, rng.randint(2, 12)))
+            present_weights = [weights[cast.index(p)] for p in present]
+            for _ in range(speeches_per_scene):
+                speaker = rng.choices(present, present_weights)[0]
+                out.append(f"<SPEECH><SPEAKER>{speaker}</SPEAKER>")
+                for _ in range(max(1, int(rng.expovariate(1 / lines_per_speech)))):
+                    out.append(f"<LINE>{' '.join(rng.choices(_WORDS, k=rng.randint(5, 10)))}</LINE>")
+                out.append("</SPEECH>")
+            out.append("</SCENE>")
+        out.append("</ACT>")
+
+    out.append("</PLAY>")
+    return "\n".join(out)
+
+
+def write_corpus(out_dir: str, n_plays: int, seed: int = 0, **play_kwargs) -> list:
+    """Write n_plays synthetic plays to out_dir and return their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(n_plays):
+        path = os.path.join(out_dir, f"synthetic_{i:05d}.xml")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(generate_play(f"Synthetic Play {i}", seed=seed + i, **play_kwargs))
+        paths.append(path)
+    return paths
+
+
+# -----------------------
+# Stages
+# -----------------------
+def _rows(result):
+    """Rows produced by a stage: table length, or 1 per play for dict outputs."""
+    if isinstance(result, dict):
+        return 1
+    if isinstance(result, tuple):
+        return sum(len(r) for r in result)
+    return len(result)
+
+
+STAGES = [
+    # (name, input key, function, output key)
+    ("parse_play_xml", "path", eda_utils.parse_play_xml, "parsed"),
+    ("extract_charcs_xml", "path", eda_utils.extract_charcs_xml, "charcs"),
+    ("merge_play_data", None, lambda p: eda_utils.merge_play_data(p["parsed"], *p["charcs"]), "merged"),
+    ("summarize_play_stats", None,
+     lambda p: eda_utils.summarize_play_stats(p["merged"], *p["charcs"], print_summary=False)["character_df"],
+     None),
+    ("build_cooccurrence_network_clean", "merged", eda_utils.build_cooccurrence_network_clean, None),
+    ("extract_speeches_and_lines_by_scene", "path", eda_utils.extract_speeches_and_lines_by_scene, None),
+]
+
+
+def _run_stage(func, key, plays, out_key, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+
+    rows = 0
+    for p in plays:
+        result = func(p[key] if key else p)
+        rows += _rows(result)
+        if out_key:
+            p[out_key] = result
+
+    stats = {
+        "seconds": time.perf_counter() - wall,
+        "cpu_seconds": time.process_time() - cpu,
+        "rows": rows,
+    }
+    if trace_memory:
+        stats["peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return stats
+
+
+def run_benchmarks(scales=(1, 10, 100), memory=True, startup=True, seed=0, **play_kwargs) -> dict:
+    """
+    Time every stage over BASE_PLAYS * scale synthetic plays. With memory=True
+    each stage is run a second time under tracemalloc to record peak memory
+    (kept separate so tracing overhead does not skew the timings). With
+    startup=True the cold-start import time of each CLI stage is recorded
+    too, against eda_utils.cli.STARTUP_BUDGET_S.
+    """
+    results = []
+    for scale in scales:
+        n_plays = BASE_PLAYS * scale
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_corpus(tmp, n_plays, seed=seed, **play_kwargs)
+            corpus_mb = sum(os.path.getsize(p) for p in paths) / 1e6
+            plays = [{"path": p} for p in paths]
+
+            for name, key, func, out_key in STAGES:
+                stats = _run_stage(func, key, plays, out_key, trace_memory=False)
+                if memory:
+                    stats["peak_mb"] = _run_stage(func, key, plays, out_key, trace_memory=True)["peak_mb"]
+                row = {"scale": scale, "plays": n_plays, "corpus_mb": round(corpus_mb, 2), "stage": name, **stats}
+                results.append(row)
+                peak = f"{row['peak_mb']:8.1f} MB" if memory else ""
+                print(f"  {scale:>4}x  {name:<38} {row['seconds']:8.3f} s {peak}")
+
+    startup_s = None
+    if startup:
+        print(f"  cold start (budget {STARTUP_BUDGET_S:.2f} s):")
+        startup_s = check_startup()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "base_plays": BASE_PLAYS,
+            "seed": seed,
+            "play_params": play_kwargs,
+        },
+        "results": results,
+        "startup_s": startup_s,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--out", default="../bench_results.json")
+    parser.add_argument("--cast-size", type=int, default=30)
+    parser.add_argument("--acts", type=int, default=5)
+    parser.add_argument("--scenes-per-act", type=int, default=5)
+    parser.add_argument("--speeches-per-scene", type=int, default=45)
+    parser.add_argument("--lines-per-speech", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--no-startup", action="store_true", help="skip the cold-start import timings")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        scales=args.scales,
+        memory=not args.no_memory,
+        startup=not args.no_startup,
+        seed=args.seed,
+        cast_size=args.cast_size,
+        acts=args.acts,
+        scenes_per_act=args.scenes_per_act,
+        speeches_per_scene=args.speeches_per_scene,
+        lines_per_speech=args.lines_per_speech,
+    )
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Saved benchmark results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Network centrality for the character co-occurrence graphs.
+
+Reads each play's _network.csv straight into edge arrays (integer node
+codes + "Scenes Together" weights) and computes, per character:
+
+    degree              number of distinct scene partners
+    degree_centrality   degree / (n - 1)
+    weighted_degree     total scenes shared with partners
+    betweenness         normalized, endpoints counted (same as
+                        nx.betweenness_centrality(G, normalized=True, endpoints=True))
+    eigenvector         leading eigenvector of the scene-weighted adjacency,
+                        L2-normalized (same as nx.eigenvector_centrality(G, weight="weight"))
+
+Betweenness runs Brandes' algorithm for a whole batch of sources at once
+with dense matrix products; casts bigger than BETWEENNESS_PIVOTS use that
+many sampled pivot sources instead of all of them.
+
+Results are cached per play in ../.play_cache/centrality, keyed by a hash
+of the edge arrays, so the plotting code and the classifier can both ask
+for them without recomputing anything.
+"""
+import glob
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from eda_utils import PLAY_CACHE_DIR, run_per_play
+
+CENTRALITY_CACHE_DIR = os.path.join(PLAY_CACHE_DIR, "centrality")
+CENTRALITY_TABLE_PATH = "../csv/all_plays_centrality.csv"
+CENTRALITY_COLUMNS = ["degree", "degree_centrality", "weighted_degree", "betweenness", "eigenvector"]
+
+BETWEENNESS_PIVOTS = 256     # exact betweenness up to this many characters
+SOURCE_BATCH = 256           # sources per batched BFS (bounds memory at batch x n)
+
+
+# -----------------------
+# Edge arrays
+# -----------------------
+def load_edges(net_path):
+    """
+    (play title, character names, src, dst, weight) from a _network.csv.
+    src/dst index into the sorted names; self-loops and blank names are dropped.
+    """
+    df = pd.read_csv(net_path, usecols=["Play", "Character A", "Character B", "Scenes Together"])
+    a = df["Character A"].astype(str).str.strip().to_numpy()
+    b = df["Character B"].astype(str).str.strip().to_numpy()
+    keep = (a != "") & (b != "") & (a != b)
+    a, b = a[keep], b[keep]
+    weight = df["Scenes Together"].to_numpy(dtype=np.int64)[keep]
+
+    names, codes = np.unique(np.concatenate([a, b]), return_inverse=True)
+    title = str(df["Play"].iloc[0]) if len(df) else os.path.basename(net_path)
+    return title, names.tolist(), codes[:len(a)], codes[len(a):], weight
+
+
+def drop_isolated(names, src, dst, weight):
+    """
+    Keep only the characters with at least one edge, re-coded to index
+    their sorted names: the same node set load_edges reads back from the
+    play's _network.csv. Returns (names, src, dst, weight).
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    used = np.unique(np.concatenate([src, dst]))
+    kept = np.asarray(names, dtype=object)[used]
+    order = np.argsort(kept, kind="stable")
+    rank = np.empty(len(names), dtype=np.int64)
+    rank[used[order]] = np.arange(len(used))
+    return kept[order].tolist(), rank[src], rank[dst], weight
+
+
+def edges_hash(names, src, dst, weight, k=None, seed=0) -> str:
+    h = hashlib.sha1("\x1f".join(names).encode("utf-8"))
+    for arr in (src, dst, weight):
+        h.update(np.ascontiguousarray(arr, dtype=np.int64).tobytes())
+    h.update(repr((k, seed)).encode())
+    return h.hexdigest()
+
+
+def _adjacency(n, src, dst, weight):
+    """Dense symmetric weighted adjacency; duplicate pairs are summed."""
+    adj = np.zeros((n, n))
+    np.add.at(adj, (src, dst), weight)
+    np.add.at(adj, (dst, src), weight)
+    return adj
+
+
+# -----------------------
+# Centralities
+# -----------------------
+def _betweenness_from(adj, sources):
+    """
+    Brandes dependency accumulation (unweighted shortest paths) for a batch
+    of sources, one row per source. Returns the endpoint-inclusive
+    betweenness contributions of those sources to every node.
+    """
+    b, n = len(sources), adj.shape[0]
+    rows = np.arange(b)
+    dist = np.full((b, n), -1, dtype=np.int64)
+    sigma = np.zeros((b, n))
+    dist[rows, sources] = 0
+    sigma[rows, sources] = 1.0
+
+    # forward: BFS level by level, counting shortest paths into each node
+    frontier = sigma.copy()
+    depth = 0
+    while True:
+        reach = frontier @ adj
+        new = (reach > 0) & (dist < 0)
+        if not new.any():
+            break
+        depth += 1
+        dist[new] = depth
+        sigma[new] = reach[new]
+        frontier = np.where(new, sigma, 0.0)
+
+    # backward: push dependencies from the deepest level up to the sources
+    delta = np.zeros((b, n))
+    safe_sigma = np.where(sigma > 0, sigma, 1.0)
+    for d in range(depth, 0, -1):
+        share = np.where(dist == d, (1.0 + delta) / safe_sigma, 0.0) @ adj
+        delta += np.where(dist == d - 1, sigma * share, 0.0)
+
+    reached = dist > 0
+    contrib = np.where(reached, delta + 1.0, 0.0)
+    contrib[rows, sources] = reached.sum(axis=1)
+    return contrib.sum(axis=0)
+
+
+def betweenness(adj, k=None, seed=0):
+    """
+    Normalized, endpoint-inclusive betweenness. With k < n, only k randomly
+    chosen pivot sources are used and the result is rescaled by n / k.
+    """
+    n = adj.shape[0]
+    if n < 2:
+        return np.zeros(n)
+    unweighted = (adj > 0).astype(float)
+    if k is None or k >= n:
+        sources = np.arange(n)
+    else:
+        sources = np.sort(np.random.default_rng(seed).choice(n, size=k, replace=False))
+
+    total = np.zeros(n)
+    for i in range(0, len(sources), SOURCE_BATCH):
+        total += _betweenness_from(unweighted, sources[i:i + SOURCE_BATCH])
+    return total / (n * (n - 1)) * (n / len(sources))
+
+
+def eigenvector(adj, max_iter=1000, tol=1e-6, x0=None):
+    """
+    Power iteration on (A + I), as in networkx, normalized to unit length.
+    x0 warm-starts the iteration (e.g. from a slightly different graph).
+    """
+    n = adj.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    x = np.full(n, 1.0 / n) if x0 is None else np.asarray(x0, dtype=float) / np.abs(x0).sum()
+    for _ in range(max_iter):
+        prev = x
+        x = prev + adj @ prev
+        norm = np.linalg.norm(x)
+        x = x / norm if norm else x
+        if np.abs(x - prev).sum() < n * tol:
+            break
+    return x
+
+
+def play_centrality_frame(title, names, src, dst, weight, k=None, seed=0) -> pd.DataFrame:
+    """One row per character with the CENTRALITY_COLUMNS, sorted by betweenness."""
+    n = len(names)
+    adj = _adjacency(n, src, dst, weight)
+    if k is None and n > BETWEENNESS_PIVOTS:
+        k = BETWEENNESS_PIVOTS
+
+    degree = (adj > 0).sum(axis=1)
+    df = pd.DataFrame({
+        "play": title,
+        "character": names,
+        "degree": degree,
+        "degree_centrality": degree / (n - 1) if n > 1 else np.zeros(n),
+        "weighted_degree": adj.sum(axis=1).astype(np.int64),
+        "betweenness": betweenness(adj, k=k, seed=seed),
+        "eigenvector": eigenvector(adj),
+    })
+    return df.sort_values(["betweenness", "character"], ascending=[False, True], ignore_index=True)
+
+
+# -----------------------
+# Cached per-play table
+# -----------------------
+def play_centrality(play_name, csv_dir="../csv", cache_dir=CENTRALITY_CACHE_DIR, k=None, seed=0) -> pd.DataFrame:
+    """
+    Centrality table for one play, by network file stem (e.g.
+    "the_tragedy_of_macbeth"). Served from the cache when the play's edges
+    have not changed.
+    """
+    title, names, src, dst, weight = load_edges(os.path.join(csv_dir, f"{play_name}_network.csv"))
+    path = os.path.join(cache_dir, f"{edges_hash(names, src, dst, weight, k, seed)}.pkl")
+    if os.path.exists(path):
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+
+    df = play_centrality_frame(title, names, src, dst, weight, k=k, seed=seed)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump(df, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return df
+
+
+def _centrality_job(args):
+    play_name, csv_dir, cache_dir = args
+    return play_centrality(play_name, csv_dir=csv_dir, cache_dir=cache_dir)
+
+
+def centrality_table(csv_dir="../csv", cache_dir=CENTRALITY_CACHE_DIR, out_path=CENTRALITY_TABLE_PATH, workers=1) -> pd.DataFrame:
+    """
+    Centrality for every *_network.csv in csv_dir, stacked into one table
+    and saved to out_path (pass out_path=None to skip writing).
+    """
+    stems = sorted(
+        os.path.basename(p)[:-len("_network.csv")]
+        for p in glob.glob(os.path.join(csv_dir, "*_network.csv"))
+    )
+    frames = run_per_play(_centrality_job, [(s, csv_dir, cache_dir) for s in stems], workers)
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["play", "character", *CENTRALITY_COLUMNS])
+    if out_path:
+        table.to_csv(out_path, index=False)
+        print(f"Saved centrality table: {out_path}")
+    return table
+
+
+def add_centrality_features(char_df, table=None, csv_dir="../csv") -> pd.DataFrame:
+    """
+    Left-join the centrality columns onto a character table keyed by
+    (play, character). Characters who never share a scene get 0.
+    """
+    if table is None:
+        table = centrality_table(csv_dir, out_path=None)
+    out = char_df.merge(table, on=["play", "character"], how="left")
+    out[CENTRALITY_COLUMNS] = out[CENTRALITY_COLUMNS].fillna(0)
+    return out
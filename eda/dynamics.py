@@ -0,0 +1,195 @@
+"""
+Scene-window dynamics features: how a character's presence rises and falls
+across a play.
+
+Each play's _speeches.csv is folded into a characters x scenes matrix of
+dialogue (the "Line Count" column, as in plot_all_scene_dominance), with
+scenes in (Act, Scene) order. Every feature is then a whole-matrix NumPy
+operation (cumulative sums for the sliding windows, one least-squares
+slope per row for momentum), so a play takes a few milliseconds whatever
+its cast size:
+
+    first_scene_pos / last_scene_pos   first / last scene spoken in, as a 0-1 position
+    presence_span                      last_scene_pos - first_scene_pos
+    window_share_mean / _max / _std    share of the dialogue in each sliding
+                                       window of WINDOW_SCENES scenes
+    presence_entropy                   normalized entropy of the character's
+                                       dialogue over those windows (0 = all
+                                       in one stretch, 1 = spread evenly)
+    dominance_momentum                 slope of the per-act dialogue share
+                                       (share points per act)
+
+dynamics_table() computes every play under csv_dir; add_dynamics_features()
+joins the columns onto all_plays_char_stats.csv rows. --with-char-stats saves
+that join as all_plays_char_stats_with_dynamics.csv; all_plays_char_stats.csv
+itself is left to the export pipeline.
+
+    python dynamics.py --workers 4 --with-char-stats
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from eda_utils import COMBINED_CHAR_STATS_PATH, run_per_play
+
+WINDOW_SCENES = 3
+DYNAMICS_TABLE_PATH = "../csv/all_plays_dynamics.csv"
+CHAR_STATS_WITH_DYNAMICS_FILE = "all_plays_char_stats_with_dynamics.csv"
+DYNAMICS_COLUMNS = [
+    "first_scene_pos", "last_scene_pos", "presence_span",
+    "window_share_mean", "window_share_max", "window_share_std",
+    "presence_entropy", "dominance_momentum",
+]
+
+
+def _safe_div(num, den):
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+# -----------------------
+# Kernels (characters x scenes matrices)
+# -----------------------
+def scene_matrix(speeches_df):
+    """
+    (characters, scene (act, scene) keys, act of each scene, counts) from a
+    _speeches.csv table; counts[i, j] is character i's dialogue in scene j.
+    """
+    char_codes, characters = pd.factorize(speeches_df["Character"], sort=True)
+    scene_keys = speeches_df["Act"].to_numpy(np.int64) * 10_000 + speeches_df["Scene"].to_numpy(np.int64)
+    scene_codes, scenes = pd.factorize(scene_keys, sort=True)
+    counts = np.zeros((len(characters), len(scenes)), dtype=np.float64)
+    np.add.at(counts, (char_codes, scene_codes), speeches_df["Line Count"].to_numpy(np.float64))
+    return list(characters), scenes, scenes // 10_000, counts
+
+
+def appearance_positions(counts):
+    """First and last scene with dialogue per row, scaled to 0-1 (0 for one-scene plays)."""
+    n_scenes = counts.shape[1]
+    present = counts > 0
+    first = present.argmax(axis=1)
+    last = n_scenes - 1 - present[:, ::-1].argmax(axis=1)
+    scale = max(n_scenes - 1, 1)
+    return first / scale, last / scale
+
+
+def window_sums(counts, window):
+    """Row sums over every run of `window` consecutive scenes (one window if the play is shorter)."""
+    window = min(window, counts.shape[1])
+    cs = np.zeros((counts.shape[0], counts.shape[1] + 1))
+    np.cumsum(counts, axis=1, out=cs[:, 1:])
+    return cs[:, window:] - cs[:, :-window]
+
+
+def window_entropy(windows):
+    """Normalized Shannon entropy of each row's distribution over the windows."""
+    n_windows = windows.shape[1]
+    if n_windows < 2:
+        return np.zeros(windows.shape[0])
+    p = _safe_div(windows, windows.sum(axis=1, keepdims=True))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(p > 0, p * np.log(p), 0.0)
+    return -terms.sum(axis=1) / np.log(n_windows)
+
+
+def act_momentum(counts, scene_acts):
+    """Least-squares slope of each row's per-act share of the dialogue, in percentage points per act."""
+    act_codes, acts = pd.factorize(scene_acts, sort=True)
+    if len(acts) < 2:
+        return np.zeros(counts.shape[0])
+    per_act = np.zeros((counts.shape[0], len(acts)))
+    np.add.at(per_act.T, act_codes, counts.T)
+    share = _safe_div(per_act, per_act.sum(axis=0, keepdims=True)) * 100
+    x = acts.astype(float) - acts.mean()
+    return (share - share.mean(axis=1, keepdims=True)) @ x / (x @ x)
+
+
+def play_dynamics_frame(speeches_df, window=WINDOW_SCENES) -> pd.DataFrame:
+    """One row per character of a play's _speeches.csv table with the DYNAMICS_COLUMNS."""
+    if speeches_df.empty:
+        return pd.DataFrame(columns=["play", "character", *DYNAMICS_COLUMNS])
+    characters, _, scene_acts, counts = scene_matrix(speeches_df)
+
+    first, last = appearance_positions(counts)
+    windows = window_sums(counts, window)
+    share = _safe_div(windows, windows.sum(axis=0, keepdims=True))
+
+    df = pd.DataFrame({
+        "play": speeches_df["Play"].iloc[0],
+        "character": characters,
+        "first_scene_pos": first,
+        "last_scene_pos": last,
+        "presence_span": last - first,
+        "window_share_mean": share.mean(axis=1),
+        "window_share_max": share.max(axis=1),
+        "window_share_std": share.std(axis=1),
+        "presence_entropy": window_entropy(windows),
+        "dominance_momentum": act_momentum(counts, scene_acts),
+    })
+    df[DYNAMICS_COLUMNS] = df[DYNAMICS_COLUMNS].round(4)
+    return df
+
+
+# -----------------------
+# Corpus table
+# -----------------------
+def _dynamics_job(args):
+    path, window = args
+    return play_dynamics_frame(pd.read_csv(path, usecols=["Play", "Act", "Scene", "Character", "Line Count"]), window)
+
+
+def dynamics_table(csv_dir="../csv", window=WINDOW_SCENES, out_path=DYNAMICS_TABLE_PATH, workers=1) -> pd.DataFrame:
+    """
+    Dynamics for every *_speeches.csv in csv_dir, stacked into one table
+    and saved to out_path (pass out_path=None to skip writing).
+    """
+    paths = sorted(glob.glob(os.path.join(csv_dir, "*_speeches.csv")))
+    frames = run_per_play(_dynamics_job, [(p, window) for p in paths], workers)
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["play", "character", *DYNAMICS_COLUMNS])
+    if out_path:
+        table.to_csv(out_path, index=False)
+        print(f"Saved dynamics table: {out_path}")
+    return table
+
+
+def add_dynamics_features(char_df, table=None, csv_dir="../csv") -> pd.DataFrame:
+    """
+    Left-join the DYNAMICS_COLUMNS onto a character table keyed by (play,
+    character), replacing any already there. Characters with no speeches get 0.
+    """
+    if table is None:
+        table = dynamics_table(csv_dir, out_path=None)
+    out = char_df.drop(columns=[c for c in DYNAMICS_COLUMNS if c in char_df.columns])
+    out = out.merge(table, on=["play", "character"], how="left")
+    out[DYNAMICS_COLUMNS] = out[DYNAMICS_COLUMNS].fillna(0)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-dir", default="../csv")
+    parser.add_argument("--window", type=int, default=WINDOW_SCENES, help="scenes per sliding window")
+    parser.add_argument("--out", default=DYNAMICS_TABLE_PATH)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--with-char-stats", action="store_true",
+        help=f"also save all_plays_char_stats.csv joined with the columns as {CHAR_STATS_WITH_DYNAMICS_FILE}",
+    )
+    args = parser.parse_args(argv)
+
+    table = dynamics_table(args.csv_dir, window=args.window, out_path=args.out, workers=args.workers)
+    if args.with_char_stats:
+        char_df = pd.read_csv(os.path.join(args.csv_dir, os.path.basename(COMBINED_CHAR_STATS_PATH)))
+        out_path = os.path.join(args.csv_dir, CHAR_STATS_WITH_DYNAMICS_FILE)
+        add_dynamics_features(char_df, table).to_csv(out_path, index=False)
+        print(f"Saved character stats with dynamics features: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Play parsing, per-play exports and corpus tooling for the Shakespeare EDA.
+
+Everything the notebooks use is still reachable as eda_utils.<name>, but
+the submodules are only imported the first time one of their names is
+looked up, so e.g. regenerating the speeches tables never loads scipy.
+
+    reader           iter_play_events (single-pass streaming XML reader)
+    parsing          extract_charcs_xml, parse_play_xml, merge_play_data, summarize_play_stats
+    aliases          AliasIndex (speaker name -> character ID -> persona entry)
+    cache            PlayBundle / PlayCorpus parse-once cache
+    runner           run_per_play / iter_per_play process-pool runner, output paths
+    networks         co-occurrence networks (_network.csv)
+    speeches         speech and line tables (_speeches.csv / _lines.csv)
+    story            story stats and scene layout (_story_stats.csv / _layout.csv)
+    build            manifest-driven incremental rebuild
+    column_store     ColumnStore, chunked on-disk columns for the all_plays_* tables
+    instrumentation  opt-in stage tracing
+
+Single stages also run from the command line; see `python -m eda_utils -h`.
+"""
+import importlib
+
+_EXPORTS = {
+    "instrumentation": ["trace_play", "stage", "traced_stage", "Trace", "tracing"],
+    "reader": ["iter_play_events", "normalize_name", "play_title"],
+    "parsing": [
+        "extract_title_xml", "extract_charcs_xml", "parse_play_xml", "merge_play_data",
+        "summarize_play_stats", "CharStats",
+    ],
+    "aliases": ["AliasIndex", "cast_ids"],
+    "cache": ["PLAY_CACHE_DIR", "code_version_hash", "play_content_hash", "PlayBundle", "PlayCorpus"],
+    "runner": [
+        "run_per_play", "iter_per_play", "play_output_paths",
+        "COMBINED_STORY_STATS_PATH", "COMBINED_CHAR_STATS_PATH",
+    ],
+    "networks": [
+        "NETWORK_COLUMNS", "CooccurrenceNetwork", "build_cooccurrence_network_clean",
+        "build_cooccurrence_adjacency", "build_networks_for_all",
+    ],
+    "speeches": ["extract_speeches_and_lines_by_scene", "extract_all_speeches_and_lines"],
+    "story": ["count_story_lines", "count_characters", "create_story_stats"],
+    "build": ["BUILD_MANIFEST_PATH", "build_outputs"],
+    "column_store": ["ColumnStore", "DEFAULT_CHUNK_ROWS"],
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,6 @@
+"""`python -m eda_utils` -> eda_utils.cli."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
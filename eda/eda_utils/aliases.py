@@ -0,0 +1,151 @@
+"""
+Per-play alias index: speaker name -> integer character ID -> persona entry.
+"""
+import numpy as np
+
+from .reader import normalize_name
+
+GROUP_SPEAKERS = {"ALL", "BOTH"}
+GROUP_DESC = "(several characters speaking together)"
+NO_DESC = "(no description found)"
+
+# dropped from speaker names before token matching ("FIRST WITCH" -> WITCH)
+_ORDINALS = {
+    "FIRST", "SECOND", "THIRD", "FOURTH", "FIFTH", "SIXTH", "SEVENTH", "EIGHTH", "NINTH", "TENTH",
+    *GROUP_SPEAKERS,
+}
+
+
+def _stem(token):
+    """Crude singular: WITCHES -> WITCH, MURDERERS -> MURDERER."""
+    if len(token) > 4 and token.endswith("ES"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("S"):
+        return token[:-1]
+    return token
+
+
+def _tokens(text):
+    return frozenset(_stem(t) for t in "".join(c if c.isalnum() else " " for c in text.upper()).split())
+
+
+class AliasIndex:
+    """
+    Resolves the speaker names of one play to integer character IDs and
+    each ID to its dramatis personae entry.
+
+    IDs are handed out per normalized name, in order of first sighting;
+    `names[id]` is that name, `descs[id]` the matched description and
+    `main[id]` whether the match is a main persona. A speaker is matched
+    against the personae by exact name, then by a unique prefix
+    ("CLEOPATRA" -> "CLEOPATRA queen of Egypt"), then by tokens. Either
+    every word of the speaker, ordinals and ALL / BOTH dropped and plurals
+    folded, occurs in the entry's name ("FIRST WITCH" -> "Three Witches"),
+    the tightest such entry winning; or, failing that, the speaker's words
+    contain a single entry's whole name ("LORD POLONIUS" -> "POLONIUS, lord
+    chamberlain", "KING CLAUDIUS" -> "CLAUDIUS, king of Denmark"). Only
+    names are matched, never descriptions, so MONTAGUE does not pick up
+    "ROMEO, son to Montague"; an entry without a name (a group line such as
+    "Three Witches") is its own name. Ties are left unresolved.
+
+    The personae tables are built once; after a name's first lookup every
+    further one is a single dict hit.
+    """
+
+    def __init__(self, main_charcs=(), side_charcs=()):
+        self.names = []
+        self.descs = []
+        self.main = []
+        self._ids = {}          # raw or normalized speaker name -> ID
+        self._exact = {}        # normalized persona name -> entry index
+        self._entries = []      # (normalized name, name tokens, desc, is main) per persona
+
+        def add(name, tokens, desc, is_main):
+            self._exact[name] = len(self._entries)
+            self._entries.append((name, tokens, desc, is_main))
+
+        for c in main_charcs:
+            name = normalize_name(c.get("name") or "")
+            if name:
+                add(name, _tokens(name), c.get("desc", ""), True)
+        for c in side_charcs:
+            name = normalize_name(c.get("name") or "")
+            desc = c.get("desc", "")
+            if name:
+                add(name, _tokens(name), desc, False)
+            elif desc:
+                add(normalize_name(desc), _tokens(desc), desc, False)
+
+    def __len__(self):
+        return len(self.names)
+
+    def id(self, speaker) -> int:
+        """Character ID of a raw speaker name."""
+        char_id = self._ids.get(speaker)
+        if char_id is None:
+            name = normalize_name(speaker)
+            char_id = self._ids.get(name)
+            if char_id is None:
+                char_id = self._ids[name] = len(self.names)
+                entry = self._match(name)
+                self.names.append(name)
+                self.descs.append(self._entries[entry][2] if entry is not None else self._unmatched(name))
+                self.main.append(entry is not None and self._entries[entry][3])
+            self._ids[speaker] = char_id
+        return char_id
+
+    def resolve(self, name) -> str:
+        """Persona description for a normalized speaker name."""
+        entry = self._match(name)
+        return self._entries[entry][2] if entry is not None else self._unmatched(name)
+
+    @staticmethod
+    def _unmatched(name):
+        return GROUP_DESC if name in GROUP_SPEAKERS else NO_DESC
+
+    def _match(self, name):
+        """Index of the persona entry a normalized speaker name refers to, or None."""
+        entry = self._exact.get(name)
+        if entry is not None:
+            return entry
+        prefixed = [
+            i for i, (persona, _, _, _) in enumerate(self._entries)
+            if persona.startswith(name + " ") or name.startswith(persona + " ")
+        ]
+        if len(prefixed) == 1:
+            return prefixed[0]
+
+        spoken = _tokens(name)
+        wanted = frozenset(t for t in spoken if t not in _ORDINALS)
+        if not wanted:
+            return None
+        hits = sorted((len(tokens), i) for i, (_, tokens, _, _) in enumerate(self._entries) if wanted <= tokens)
+        if hits:
+            return hits[0][1] if len(hits) == 1 or hits[0][0] != hits[1][0] else None
+        # titles in front of the persona name: LORD POLONIUS, KING CLAUDIUS
+        within = [i for i, (_, tokens, _, _) in enumerate(self._entries) if tokens and tokens <= spoken]
+        return within[0] if len(within) == 1 else None
+
+
+def cast_ids(names) -> dict:
+    """
+    The character IDs written to the exported tables: a play's distinct
+    non-blank speaker names numbered in sorted order. The merged "cast",
+    the speech / line tables and the network all number a play this way,
+    so the same ID means the same character in every one of them.
+    """
+    return {name: i for i, name in enumerate(sorted({n for n in names if n}))}
+
+
+def by_name(cast, ids):
+    """
+    Re-code character IDs so codes follow the names' sort order, keeping
+    only the IDs that occur. Returns (codes for `ids`, names of the codes).
+    """
+    cast = np.asarray(cast, dtype=object)
+    ids = np.asarray(ids, dtype=np.int64)
+    used = np.unique(ids)
+    used = used[np.argsort(cast[used], kind="stable")]
+    rank = np.empty(len(cast), dtype=np.int64)
+    rank[used] = np.arange(len(used))
+    return rank[ids], cast[used].tolist()
@@ -0,0 +1,138 @@
+"""
+Incremental rebuild of the csv/ outputs with a content-hash manifest.
+"""
+import json
+import os
+
+import pandas as pd
+
+from .cache import PLAY_CACHE_DIR, PlayBundle, PlayCorpus, code_version_hash
+from .networks import _export_network
+from .runner import (
+    COMBINED_CHAR_STATS_PATH, COMBINED_STORY_STATS_PATH, _run_works, _write_csv, play_output_paths
+)
+from .speeches import _export_speeches_and_lines
+from .story import _export_story_stats
+
+BUILD_MANIFEST_PATH = os.path.join(PLAY_CACHE_DIR, "build_manifest.json")
+
+
+def _load_manifest(path):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    return {"artifacts": {}}
+
+
+def _save_manifest(manifest, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _is_fresh(entry, source_hash, code_version):
+    return (
+        entry is not None
+        and entry["source_hash"] == source_hash
+        and entry["code_version"] == code_version
+        and all(os.path.exists(f) for f in entry["files"])
+    )
+
+
+def _patch_combined(path, play_col, play_order, fresh_rows):
+    """
+    Rewrite a combined all_plays_* table, swapping in `fresh_rows` (play ->
+    DataFrame) and keeping every other play's existing rows as they are.
+    Plays come out in `play_order`, same as a full rebuild. Returns None,
+    writing nothing, when there are no rows for any of those plays.
+    """
+    # round_trip so untouched rows are written back bit-for-bit
+    existing = pd.read_csv(path, float_precision="round_trip") if os.path.exists(path) else None
+    parts = []
+    for play in play_order:
+        if play in fresh_rows:
+            parts.append(fresh_rows[play])
+        elif existing is not None:
+            parts.append(existing[existing[play_col] == play])
+    if not parts:
+        return None
+    combined = pd.concat(parts, ignore_index=True)
+    _write_csv(combined, path)
+    return combined
+
+
+def build_outputs(works: list, workers=1, manifest_path=BUILD_MANIFEST_PATH, force=False):
+    """
+    Bring every csv/ output for `works` up to date, regenerating only what
+    is stale. Each per-play artifact (network, speeches + lines, story stats
+    + layout, character stats rows) is recorded in a manifest together with
+    the play's XML hash and the code version that produced it; an artifact
+    is rebuilt when either changed or one of its files is missing. The
+    all_plays_* tables are then patched by replacing only the rebuilt
+    plays' rows. Returns {kind: [rebuilt play names]}.
+    """
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    manifest = _load_manifest(manifest_path)
+    artifacts = manifest.setdefault("artifacts", {})
+    code_version = code_version_hash()
+
+    play_order = [w["work_name"] for w in works]
+    source_hashes = {w["work_name"]: PlayBundle.for_work(w).key for w in works}
+
+    def stale(kind):
+        return [
+            w for w in works
+            if force or not _is_fresh(
+                artifacts.get(w["work_name"], {}).get(kind),
+                source_hashes[w["work_name"]], code_version
+            )
+        ]
+
+    def record(kind, plays, files_of):
+        for play in plays:
+            artifacts.setdefault(play, {})[kind] = {
+                "source_hash": source_hashes[play],
+                "code_version": code_version,
+                "files": files_of(play),
+            }
+
+    rebuilt = {}
+
+    # --- Per-play CSVs ---
+    for kind, job in (("network", _export_network), ("speeches", _export_speeches_and_lines)):
+        todo = stale(kind)
+        for log in _run_works(job, todo, workers):
+            print("\n".join(log))
+        rebuilt[kind] = [w["work_name"] for w in todo]
+        record(kind, rebuilt[kind], lambda play, kind=kind: play_output_paths(play)[kind])
+
+    todo = stale("story")
+    story_rows = {}
+    for w, (summary_df, log) in zip(todo, _run_works(_export_story_stats, todo, workers)):
+        story_rows[w["work_name"]] = summary_df
+        print("\n".join(log))
+    rebuilt["story"] = list(story_rows)
+    if story_rows or not os.path.exists(COMBINED_STORY_STATS_PATH):
+        if _patch_combined(COMBINED_STORY_STATS_PATH, "Play", play_order, story_rows) is not None:
+            print(f"Updated {COMBINED_STORY_STATS_PATH} ({len(story_rows)} plays rebuilt)")
+    # the combined table is listed too, so deleting it makes every play stale
+    record("story", rebuilt["story"], lambda play: play_output_paths(play)["story"] + [COMBINED_STORY_STATS_PATH])
+
+    # --- Character stats rows ---
+    todo = stale("char_stats")
+    corpus = PlayCorpus([], cache_dir=PLAY_CACHE_DIR)
+    corpus.bundles = [PlayBundle.for_work(w) for w in todo]
+    corpus.prepare(workers)
+    char_rows = {w["work_name"]: b.summary["character_df"] for w, b in zip(todo, corpus)}
+    rebuilt["char_stats"] = list(char_rows)
+    if char_rows or not os.path.exists(COMBINED_CHAR_STATS_PATH):
+        if _patch_combined(COMBINED_CHAR_STATS_PATH, "play", play_order, char_rows) is not None:
+            print(f"Updated {COMBINED_CHAR_STATS_PATH} ({len(char_rows)} plays rebuilt)")
+    record("char_stats", rebuilt["char_stats"], lambda play: [COMBINED_CHAR_STATS_PATH])
+
+    _save_manifest(manifest, manifest_path)
+
+    n_fresh = sum(len(works) - len(plays) for plays in rebuilt.values())
+    print(f"Incremental build: {sum(map(len, rebuilt.values()))} artifacts rebuilt, {n_fresh} up to date")
+    return rebuilt
@@ -0,0 +1,265 @@
+"""
+Parse-once play cache: PlayBundle / PlayCorpus.
+"""
+import ast
+import functools
+import glob
+import hashlib
+import os
+import pickle
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+from .column_store import DEFAULT_CHUNK_ROWS, ColumnStore
+from .instrumentation import trace_play
+from .parsing import extract_charcs_xml, merge_play_data, parse_play_xml, summarize_play_stats
+from .reader import play_title
+from .runner import run_per_play
+
+PLAY_CACHE_DIR = "../.play_cache"
+
+# modules that only drive the pipeline and never change its outputs
+_UNVERSIONED = {"__init__.py", "__main__.py", "cli.py"}
+
+
+def _sibling_imports(path):
+    """Top-level modules next to the package (eda/*.py) that a package module imports."""
+    with open(path, "rb") as fh:
+        tree = ast.parse(fh.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".")[0])
+    parent = os.path.dirname(os.path.dirname(os.path.abspath(path)))
+    return {p for p in (os.path.join(parent, f"{n}.py") for n in names) if os.path.exists(p)}
+
+
+@functools.lru_cache(maxsize=None)
+def code_version_hash() -> str:
+    """
+    Hash of the source the exporters run: this package's modules plus any
+    top-level module they import; any change marks every output stale.
+    """
+    package = [
+        p for p in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.py")))
+        if os.path.basename(p) not in _UNVERSIONED
+    ]
+    extra = set().union(*(_sibling_imports(p) for p in package))
+    h = hashlib.sha1()
+    for path in package + sorted(extra):
+        with open(path, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()
+
+
+def play_content_hash(source) -> str:
+    """
+    SHA-1 of a play's XML, from a file path, open file or parsed tree.
+    Files are hashed byte-for-byte and trees by their serialization, so the
+    same play read both ways gets two different cache entries.
+    """
+    if isinstance(source, ET.ElementTree):
+        source = source.getroot()
+    if ET.iselement(source):
+        data = ET.tostring(source)
+    elif hasattr(source, "read"):
+        data = source.read()
+        source.seek(0)
+    else:
+        with open(source, "rb") as fh:
+            data = fh.read()
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+_PLAY_VIEWS = ("characters", "parsed", "merged", "summary")
+
+
+class PlayBundle:
+    """
+    Characters, parsed, merged and summarized views of one play.
+
+    Each view is computed at most once. With a cache_dir, views are stored
+    under the play's content hash, so later runs (and other stages) load
+    them from disk instead of parsing the XML again.
+    """
+
+    def __init__(self, source, cache_dir=PLAY_CACHE_DIR):
+        self.source = source
+        self.cache_dir = cache_dir
+        self._key = None
+        self._views = None
+
+    @property
+    def key(self) -> str:
+        if self._key is None:
+            self._key = play_content_hash(self.source)
+        return self._key
+
+    @property
+    def cache_path(self):
+        if not self.cache_dir:
+            return None
+        # entries written by other versions of this module are never reused
+        return os.path.join(self.cache_dir, f"{self.key}.{code_version_hash()[:12]}.pkl")
+
+    def _load(self):
+        if self._views is not None:
+            return
+        self._views = {}
+        path = self.cache_path
+        if path and os.path.exists(path):
+            with open(path, "rb") as fh:
+                self._views = pickle.load(fh)
+
+    def _save(self):
+        path = self.cache_path
+        if not path:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            pickle.dump(self._views, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def release(self):
+        """Drop the in-memory views; with a cache_dir they reload from disk on next use."""
+        self._views = None
+
+    def is_complete(self) -> bool:
+        """True when every view is already in memory or on disk."""
+        self._load()
+        return all(name in self._views for name in _PLAY_VIEWS)
+
+    def _view(self, name, compute):
+        self._load()
+        if name not in self._views:
+            self._views[name] = compute()
+            self._save()
+        return self._views[name]
+
+    @property
+    def characters(self):
+        """(main_charcs, side_charcs) from the dramatis personae."""
+        return self._view("characters", lambda: extract_charcs_xml(self.source))
+
+    @property
+    def main_charcs(self):
+        return self.characters[0]
+
+    @property
+    def side_charcs(self):
+        return self.characters[1]
+
+    @property
+    def parsed(self):
+        return self._view("parsed", lambda: parse_play_xml(self.source))
+
+    @property
+    def merged(self):
+        return self._view(
+            "merged", lambda: merge_play_data(self.parsed, self.main_charcs, self.side_charcs)
+        )
+
+    @property
+    def summary(self):
+        return self._view(
+            "summary",
+            lambda: summarize_play_stats(
+                self.merged, self.main_charcs, self.side_charcs, print_summary=False
+            )
+        )
+
+    @property
+    def title(self):
+        return self.parsed["title"]
+
+    @classmethod
+    def for_work(cls, lit_work: dict, cache_dir=PLAY_CACHE_DIR):
+        """Bundle for a `works` entry, created once and kept in lit_work["bundle"]."""
+        bundle = lit_work.get("bundle")
+        if bundle is None:
+            bundle = cls(lit_work["work_xml"], cache_dir=cache_dir)
+            lit_work["bundle"] = bundle
+        return bundle
+
+
+def _compute_play_views(source):
+    """Every view of one play, computed from scratch (runs inside pool workers)."""
+    # an open file would be consumed by the title read; its stages stay unattributed
+    title = None if hasattr(source, "read") else play_title(source)
+    with trace_play(title):
+        bundle = PlayBundle(source, cache_dir=None)
+        bundle.summary
+    return bundle._views
+
+
+class PlayCorpus:
+    """Ordered collection of PlayBundles sharing one cache directory."""
+
+    def __init__(self, sources, cache_dir=PLAY_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.bundles = [PlayBundle(s, cache_dir=cache_dir) for s in sources]
+
+    @classmethod
+    def from_works(cls, works: list, cache_dir=PLAY_CACHE_DIR, workers=1):
+        """
+        Corpus over the notebook's `works` list. Each work gets its bundle in
+        w["bundle"] plus the usual work_name / main_charcs / side_charcs /
+        parsed_play / merged entries.
+        """
+        corpus = cls([], cache_dir=cache_dir)
+        corpus.bundles = [PlayBundle.for_work(w, cache_dir=cache_dir) for w in works]
+        corpus.prepare(workers)
+        for w, bundle in zip(works, corpus.bundles):
+            w["work_name"] = bundle.title
+            w["main_charcs"], w["side_charcs"] = bundle.characters
+            w["parsed_play"] = bundle.parsed
+            w["merged"] = bundle.merged
+        return corpus
+
+    def prepare(self, workers=1):
+        """Compute every play's missing views, across a process pool when workers > 1."""
+        _prepare_bundles(self.bundles, workers)
+
+    def __iter__(self):
+        return iter(self.bundles)
+
+    def __len__(self):
+        return len(self.bundles)
+
+    def __getitem__(self, i):
+        return self.bundles[i]
+
+    def character_stats(self, workers=1) -> pd.DataFrame:
+        """All plays' character_df tables stacked in corpus order."""
+        self.prepare(workers)
+        return pd.concat([b.summary["character_df"] for b in self.bundles], ignore_index=True)
+
+    def write_character_stats(self, store_dir, workers=1, window=256, chunk_rows=DEFAULT_CHUNK_ROWS) -> ColumnStore:
+        """
+        Out-of-core character_stats: plays are summarized `window` at a time,
+        appended to a ColumnStore at store_dir and released again, so memory
+        does not grow with the corpus. Call .to_csv() / .totals() on the
+        returned store for the combined table and corpus-level totals.
+        """
+        with ColumnStore.create(store_dir, chunk_rows=chunk_rows) as store:
+            for start in range(0, len(self.bundles), window):
+                part = self.bundles[start:start + window]
+                _prepare_bundles(part, workers)
+                for bundle in part:
+                    store.append(bundle.summary["character_df"])
+                    bundle.release()
+        return store
+
+
+def _prepare_bundles(bundles, workers=1):
+    pending = [b for b in bundles if not b.is_complete()]
+    results = run_per_play(_compute_play_views, [b.source for b in pending], workers)
+    for bundle, views in zip(pending, results):
+        bundle._views.update(views)
+        bundle._save()
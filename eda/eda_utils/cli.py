@@ -0,0 +1,154 @@
+"""
+Command-line entry point: run one export stage without the notebooks.
+
+    python -m eda_utils networks    [PLAY ...] [--workers N]
+    python -m eda_utils speeches    [PLAY ...]
+    python -m eda_utils story-stats [PLAY ...]
+    python -m eda_utils char-stats  [PLAY ...] [--store-dir DIR]
+    python -m eda_utils startup     [--budget SECONDS]
+
+PLAY is a path to a play's XML file; with --nltk (or no PLAY at all) the
+names are NLTK shakespeare corpus file ids and default to the eight plays
+of eda.ipynb. Run from eda/, like the notebooks: outputs go to ../csv.
+
+Each stage imports only the submodules it needs (STAGE_MODULES); `startup`
+times that in a fresh interpreter per stage and fails when any stage takes
+longer than STARTUP_BUDGET_S.
+"""
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+
+NOTEBOOK_PLAYS = [
+    "dream.xml", "hamlet.xml", "macbeth.xml", "r_and_j.xml",
+    "a_and_c.xml", "j_caesar.xml", "merchant.xml", "othello.xml",
+]
+
+# stage -> eda_utils submodules it imports
+STAGE_MODULES = {
+    "networks": ["cache", "networks"],
+    "speeches": ["parsing", "speeches"],
+    "story-stats": ["parsing", "story"],
+    "char-stats": ["cache", "runner"],
+}
+
+# import budget for a single stage, in seconds (measured by `startup`)
+STARTUP_BUDGET_S = 0.5
+
+
+def load_stage(stage):
+    """Import the submodules `stage` needs; returns them by name."""
+    return {name: importlib.import_module(f"eda_utils.{name}") for name in STAGE_MODULES[stage]}
+
+
+def play_paths(names, use_nltk=False):
+    """XML paths for the CLI's PLAY arguments (NLTK file ids when use_nltk or none given)."""
+    if names and not use_nltk:
+        return list(names)
+    import nltk
+    return [nltk.corpus.shakespeare.abspath(fileid) for fileid in names or NOTEBOOK_PLAYS]
+
+
+def _title_only_works(paths, with_characters=False):
+    """
+    `works` entries for stages that need no parsed views: the title comes
+    from the first event of a streaming read, the cast from the personae.
+    """
+    from .parsing import extract_charcs_xml
+    from .reader import iter_play_events
+
+    works = []
+    for path in paths:
+        w = {"work_xml": path, "work_name": "Unknown Play"}
+        for event in iter_play_events(path):
+            if event[0] == "title":
+                w["work_name"] = event[1]
+                break
+        if with_characters:
+            w["main_charcs"], w["side_charcs"] = extract_charcs_xml(path)
+        works.append(w)
+    return works
+
+
+def run_stage(stage, paths, workers=1, store_dir=None):
+    modules = load_stage(stage)
+
+    if stage == "networks":
+        works = [{"work_xml": p} for p in paths]
+        modules["cache"].PlayCorpus.from_works(works, workers=workers)
+        modules["networks"].build_networks_for_all(works, workers=workers)
+    elif stage == "speeches":
+        modules["speeches"].extract_all_speeches_and_lines(_title_only_works(paths), workers=workers)
+    elif stage == "story-stats":
+        modules["story"].create_story_stats(_title_only_works(paths, with_characters=True), workers=workers)
+    elif stage == "char-stats":
+        corpus = modules["cache"].PlayCorpus(paths)
+        out_path = modules["runner"].COMBINED_CHAR_STATS_PATH
+        if store_dir:
+            store = corpus.write_character_stats(store_dir, workers=workers)
+            store.to_csv(out_path)
+        else:
+            corpus.character_stats(workers=workers).to_csv(out_path, index=False)
+        print(f"Saved character stats for {len(corpus)} plays: {out_path}")
+
+
+def measure_startup(stage, repeat=3) -> float:
+    """Best-of-`repeat` seconds to import `stage` in a fresh interpreter."""
+    code = (
+        "import time; t = time.perf_counter(); "
+        "from eda_utils.cli import load_stage; "
+        f"load_stage({stage!r}); print(time.perf_counter() - t)"
+    )
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=package_parent, capture_output=True, text=True, check=True
+        )
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return min(times)
+
+
+def check_startup(budget=STARTUP_BUDGET_S, repeat=3) -> dict:
+    """Import time per stage; prints a table and returns {stage: seconds}."""
+    results = {}
+    for stage in STAGE_MODULES:
+        results[stage] = measure_startup(stage, repeat)
+        flag = "ok" if results[stage] <= budget else "OVER BUDGET"
+        print(f"  {stage:<12} {results[stage]:6.3f} s  {flag}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m eda_utils", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for stage in STAGE_MODULES:
+        p = sub.add_parser(stage, help=f"write the {stage} csv outputs")
+        p.add_argument("plays", nargs="*", help="play XML paths (or NLTK file ids with --nltk)")
+        p.add_argument("--nltk", action="store_true", help="treat PLAY names as NLTK shakespeare file ids")
+        p.add_argument("--workers", type=int, default=1, help="process-pool size (0 = one per CPU)")
+        if stage == "char-stats":
+            p.add_argument("--store-dir", help="stream through an on-disk ColumnStore here")
+
+    p = sub.add_parser("startup", help="time each stage's imports against the budget")
+    p.add_argument("--budget", type=float, default=STARTUP_BUDGET_S)
+    p.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "startup":
+        results = check_startup(args.budget, args.repeat)
+        return 0 if max(results.values()) <= args.budget else 1
+
+    run_stage(
+        args.command,
+        play_paths(args.plays, args.nltk),
+        workers=args.workers or None,
+        store_dir=getattr(args, "store_dir", None),
+    )
+    return 0
@@ -0,0 +1,226 @@
+"""
+Append-only, on-disk columnar tables for corpus-sized outputs.
+
+A ColumnStore is a directory of chunks. Rows are buffered in memory until
+chunk_rows of them have arrived, then written out column by column:
+
+    meta.json                   column order + per-chunk row counts and dtypes
+    chunk_000000/col_0000.npy   numeric / bool columns (files are named by
+                                the column's position in meta.json)
+    chunk_000000/col_0001.codes.npy + col_0001.dict.json
+                                text columns, dictionary-encoded per chunk
+                                (code -1 = missing)
+
+meta.json is rewritten after every chunk, so a store is readable (and can
+be appended to again) after an interrupted run. Reading goes chunk by
+chunk through memory-mapped arrays, so totals and CSV export use memory
+proportional to one chunk, not to the whole table. Chunks are combined
+with the same dtype rules as pd.concat, so a store written play by play
+exports the same CSV as concatenating every play's frame up front.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+COLUMN_STORE_VERSION = 1
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+class ColumnStore:
+    """See the module docstring for the on-disk layout."""
+
+    def __init__(self, path, meta, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.path = path
+        self.meta = meta
+        self.chunk_rows = chunk_rows
+        self._buffer = []
+        self._buffered = 0
+
+    @classmethod
+    def create(cls, path, chunk_rows=DEFAULT_CHUNK_ROWS, overwrite=True):
+        """New, empty store at path (an existing store there is removed unless overwrite=False)."""
+        if os.path.exists(path):
+            if not overwrite:
+                raise FileExistsError(path)
+            shutil.rmtree(path)
+        os.makedirs(path)
+        store = cls(path, {"version": COLUMN_STORE_VERSION, "columns": [], "chunks": []}, chunk_rows)
+        store._save_meta()
+        return store
+
+    @classmethod
+    def open(cls, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("version") != COLUMN_STORE_VERSION:
+            raise ValueError(f"{path} was written by a different ColumnStore version; rebuild it.")
+        return cls(path, meta, chunk_rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def __len__(self):
+        return sum(c["rows"] for c in self.meta["chunks"]) + self._buffered
+
+    @property
+    def columns(self):
+        return list(self.meta["columns"])
+
+    # -----------------------
+    # Writing
+    # -----------------------
+    def append(self, df: pd.DataFrame):
+        """Queue df's rows; a chunk is written whenever chunk_rows have built up."""
+        if len(df.columns) == 0:
+            return
+        self._buffer.append(df)
+        self._buffered += len(df)
+        if self._buffered >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Write whatever is buffered as one chunk."""
+        if not self._buffer:
+            return
+        df = pd.concat(self._buffer, ignore_index=True)
+        self._buffer, self._buffered = [], 0
+
+        chunk_dir = os.path.join(self.path, f"chunk_{len(self.meta['chunks']):06d}")
+        os.makedirs(chunk_dir, exist_ok=True)
+        dtypes = {}
+        for col in df.columns:
+            if col not in self.meta["columns"]:
+                self.meta["columns"].append(col)
+            base = os.path.join(chunk_dir, self._file_stem(col))
+            values = df[col]
+            if values.dtype.kind in "biuf":
+                np.save(f"{base}.npy", values.to_numpy())
+                dtypes[col] = values.dtype.str
+            else:
+                codes, uniques = pd.factorize(values)
+                np.save(f"{base}.codes.npy", codes.astype(np.int32))
+                with open(f"{base}.dict.json", "w", encoding="utf-8") as fh:
+                    json.dump([_json_value(v) for v in uniques], fh, ensure_ascii=False)
+                dtypes[col] = "object"
+
+        self.meta["chunks"].append({"rows": len(df), "dtypes": dtypes})
+        self._save_meta()
+
+    def _file_stem(self, col):
+        # column names may hold "/" etc., so files are named by position
+        return f"col_{self.meta['columns'].index(col):04d}"
+
+    def _save_meta(self):
+        path = os.path.join(self.path, "meta.json")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.meta, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    # -----------------------
+    # Reading
+    # -----------------------
+    def _result_dtypes(self):
+        """Dtype of every column across all chunks, following pd.concat."""
+        out = {}
+        for col in self.meta["columns"]:
+            kinds = [c["dtypes"].get(col) for c in self.meta["chunks"]]
+            present = [np.dtype(k) for k in kinds if k not in (None, "object")]
+            if "object" in kinds or (present and len({d.kind == "b" for d in present}) > 1):
+                out[col] = np.dtype(object)
+            elif None in kinds:
+                # a chunk without the column contributes NaNs
+                out[col] = np.result_type(np.float64, *present) if all(d.kind != "b" for d in present) else np.dtype(object)
+            else:
+                out[col] = np.result_type(*present)
+        return out
+
+    def _read_column(self, chunk_dir, col, dtype, rows):
+        if dtype is None:
+            return np.full(rows, np.nan)
+        base = os.path.join(chunk_dir, self._file_stem(col))
+        if dtype != "object":
+            return np.load(f"{base}.npy", mmap_mode="r")
+        codes = np.load(f"{base}.codes.npy", mmap_mode="r")
+        with open(f"{base}.dict.json", encoding="utf-8") as fh:
+            uniques = np.asarray(json.load(fh) + [np.nan], dtype=object)
+        return uniques[codes]          # code -1 picks the trailing NaN
+
+    def iter_chunks(self, columns=None):
+        """Yield the stored rows as DataFrames, one chunk at a time."""
+        self.flush()
+        columns = self.columns if columns is None else list(columns)
+        result = self._result_dtypes()
+        for i, chunk in enumerate(self.meta["chunks"]):
+            chunk_dir = os.path.join(self.path, f"chunk_{i:06d}")
+            data = {}
+            for col in columns:
+                values = self._read_column(chunk_dir, col, chunk["dtypes"].get(col), chunk["rows"])
+                data[col] = np.asarray(values).astype(result[col], copy=False)
+            yield pd.DataFrame(data, columns=columns)
+
+    def to_frame(self, columns=None) -> pd.DataFrame:
+        """The whole table in memory (only for stores that fit)."""
+        frames = list(self.iter_chunks(columns))
+        if not frames:
+            return pd.DataFrame(columns=self.columns if columns is None else list(columns))
+        return pd.concat(frames, ignore_index=True)
+
+    def to_csv(self, path, **kwargs):
+        """Stream the table to a CSV file, one chunk at a time."""
+        kwargs.setdefault("index", False)
+        header = True
+        with open(path, "w", encoding="utf-8", newline="") as fh:
+            for df in self.iter_chunks():
+                df.to_csv(fh, header=header, **kwargs)
+                header = False
+            if header:
+                pd.DataFrame(columns=self.columns).to_csv(fh, **kwargs)
+        return path
+
+    def totals(self, by=None, columns=None) -> pd.DataFrame:
+        """
+        count / sum / mean / min / max of every numeric column (or `columns`),
+        over the whole table or per value of the `by` column, computed one
+        chunk at a time.
+        """
+        self.flush()
+        result = self._result_dtypes()
+        if columns is None:
+            columns = [c for c, d in result.items() if d.kind in "iuf" and c != by]
+        columns = list(columns)
+
+        # running per-group partials; each chunk is folded in and dropped
+        count = total = low = high = None
+        for df in self.iter_chunks(columns + ([by] if by else [])):
+            groups = df[columns].groupby(df[by] if by else np.zeros(len(df), dtype=np.int8))
+            if count is None:
+                count, total, low, high = groups.count(), groups.sum(), groups.min(), groups.max()
+                continue
+            count = count.add(groups.count(), fill_value=0)
+            total = total.add(groups.sum(), fill_value=0)
+            low = pd.concat([low, groups.min()]).groupby(level=0).min()
+            high = pd.concat([high, groups.max()]).groupby(level=0).max()
+
+        if count is None:
+            return pd.DataFrame(columns=["count", "sum", "mean", "min", "max"])
+        stats = {"count": count, "sum": total, "mean": total / count, "min": low, "max": high}
+        if by is None:
+            return pd.DataFrame({name: frame.iloc[0] for name, frame in stats.items()})
+        out = pd.concat(stats, axis=1).swaplevel(axis=1)
+        out = out[pd.MultiIndex.from_product([columns, list(stats)])]
+        out.index.name = by
+        return out
+
+
+def _json_value(value):
+    """Dictionary entries as JSON-safe Python scalars."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
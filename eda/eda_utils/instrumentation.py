@@ -0,0 +1,196 @@
+"""
+Opt-in per-stage timing and memory tracing for the export pipeline.
+
+Stages wrapped in stage() / traced_stage() cost nothing until tracing() is
+active; records from run_per_play workers are shipped back to the parent.
+"""
+import contextvars
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Records of the active trace, or None when tracing is off (the default).
+_TRACE = None
+_TRACE_PLAY = contextvars.ContextVar("trace_play", default=None)
+
+
+def _peak_rss_mb():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        return None
+
+
+def _count_rows(result):
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, tuple) and all(isinstance(r, pd.DataFrame) for r in result):
+        return sum(len(r) for r in result)
+    if isinstance(result, tuple) and all(isinstance(r, list) for r in result):
+        return sum(len(r) for r in result)    # parse_charcs: (main, side) character lists
+    if isinstance(result, dict) and "acts" in result:
+        return sum(len(act["scenes"]) for act in result["acts"])
+    if isinstance(result, dict) and "character_df" in result:
+        return len(result["character_df"])    # summarize
+    return None
+
+
+@contextmanager
+def trace_play(play):
+    """Attribute stages run inside this block to `play`."""
+    token = _TRACE_PLAY.set(play)
+    try:
+        yield
+    finally:
+        _TRACE_PLAY.reset(token)
+
+
+class _StageRecord:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = None
+
+
+@contextmanager
+def stage(name, play=None):
+    """
+    Time a block as pipeline stage `name` when tracing is on. Set `.rows` on
+    the yielded object to record how many rows the block produced.
+    """
+    record = _StageRecord()
+    if _TRACE is None:
+        yield record
+        return
+
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield record
+    finally:
+        _TRACE.append({
+            "stage": name,
+            "play": play if play is not None else _TRACE_PLAY.get(),
+            "wall_s": time.perf_counter() - wall,
+            "cpu_s": time.process_time() - cpu,
+            "peak_rss_mb": _peak_rss_mb(),
+            "rows": record.rows,
+            "pid": os.getpid(),
+        })
+
+
+def traced_stage(name):
+    """Decorator form of stage(); rows are taken from the returned tables."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _TRACE is None:
+                return func(*args, **kwargs)
+            with stage(name) as record:
+                result = func(*args, **kwargs)
+                record.rows = _count_rows(result)
+            return result
+        return wrapper
+    return decorate
+
+
+class Trace:
+    """Stage records collected while tracing() was active."""
+
+    def __init__(self, records=None):
+        self.records = records if records is not None else []
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = ["stage", "play", "wall_s", "cpu_s", "peak_rss_mb", "rows", "pid"]
+        return pd.DataFrame(self.records, columns=columns)
+
+    def save(self, path):
+        """Write the records as JSON or CSV, depending on the file extension."""
+        if path.endswith(".csv"):
+            self.to_frame().to_csv(path, index=False)
+        else:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(self.records, fh, indent=1)
+
+    def hot_spots(self, top=10) -> pd.DataFrame:
+        """Stages and (stage, play) pairs ranked by total wall time."""
+        df = self.to_frame()
+        if df.empty:
+            return df
+        return (
+            df.groupby(["stage", "play"], dropna=False)
+            .agg(calls=("wall_s", "size"), wall_s=("wall_s", "sum"), cpu_s=("cpu_s", "sum"),
+                 peak_rss_mb=("peak_rss_mb", "max"), rows=("rows", "sum"))
+            .sort_values("wall_s", ascending=False)
+            .head(top)
+            .reset_index()
+        )
+
+    def print_summary(self, top=10):
+        df = self.to_frame()
+        if df.empty:
+            print("No stages traced.")
+            return
+        total = df["wall_s"].sum()
+        by_stage = df.groupby("stage")["wall_s"].sum().sort_values(ascending=False)
+
+        print("=" * 50)
+        print(f"Traced {len(df)} stage calls, {total:.2f} s total")
+        print("=" * 50)
+        for name, wall in by_stage.items():
+            print(f"  {name:<24} {wall:8.3f} s  ({wall / total * 100:5.1f}%)")
+        print(f"\nTop {top} hot spots:")
+        print(self.hot_spots(top).round(3).to_string(index=False))
+
+
+@contextmanager
+def tracing(path=None, summary=True, top=10):
+    """
+    Record every instrumented stage run inside the block (including those
+    in run_per_play workers). On exit the trace is saved to `path` (.json
+    or .csv) and a hot-spot summary is printed.
+    """
+    global _TRACE
+    previous = _TRACE
+    trace = Trace()
+    _TRACE = trace.records
+    try:
+        yield trace
+    finally:
+        _TRACE = previous
+        if previous is not None:
+            previous.extend(trace.records)
+        if path:
+            trace.save(path)
+        if summary:
+            trace.print_summary(top)
+
+
+class _TracedJob:
+    """Runs a per-play job with tracing on and hands its records back to the parent."""
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, item):
+        global _TRACE
+        _TRACE = []
+        try:
+            return self.func(item), _TRACE
+        finally:
+            _TRACE = None
@@ -0,0 +1,156 @@
+"""
+Scene co-occurrence networks and the per-play _network.csv export.
+"""
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .aliases import by_name
+from .cache import PlayBundle
+from .instrumentation import traced_stage
+from .runner import _play_job, _run_works, _write_csv, play_output_paths
+
+
+NETWORK_COLUMNS = [
+    "Play", "Character A", "Character B", "Scenes Together",
+    "Scenes List", "Acts Together", "Scenes Together (IDs)",
+    "Character A ID", "Character B ID"
+]
+
+
+class CooccurrenceNetwork:
+    """
+    Scene co-occurrence network of a play, backed by sparse matrices.
+
+    incidence:  characters x scenes CSR matrix, 1 where the character speaks
+    adjacency:  characters x characters CSR matrix of shared-scene counts
+                (incidence @ incidence.T with the diagonal dropped)
+
+    `characters` holds the normalized names in sorted order (row order), so
+    a row index is the character's exported ID (aliases.cast_ids), and
+    `scenes` the (act, scene) pair of each column. Which scenes a pair shares
+    is only worked out when asked for.
+    """
+
+    def __init__(self, title, characters, scenes, incidence):
+        self.title = title
+        self.characters = characters
+        self.scenes = scenes
+        self.incidence = incidence
+
+    @classmethod
+    def from_merged(cls, merged_play):
+        scene_cols = {}
+        rows = []
+        cols = []
+        for act in merged_play["acts"]:
+            for scene in act["scenes"]:
+                col = scene_cols.setdefault((act["act"], scene["scene"]), len(scene_cols))
+                for s in scene["speakers"]:
+                    if s["name"]:
+                        rows.append(s["char_id"])
+                        cols.append(col)
+
+        codes, characters = by_name(merged_play["cast"], rows)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(codes), dtype=np.int32), (codes, np.asarray(cols, dtype=np.int64))),
+            shape=(len(characters), len(scene_cols))
+        )
+        incidence.sum_duplicates()
+        incidence.data[:] = 1
+
+        return cls(merged_play["title"], characters, list(scene_cols), incidence)
+
+    @cached_property
+    def adjacency(self):
+        adj = (self.incidence @ self.incidence.T).tocsr()
+        adj.setdiag(0)
+        adj.eliminate_zeros()
+        return adj
+
+    def edges(self):
+        """(i, j, weight) arrays for every pair i < j sharing at least one scene."""
+        upper = sparse.triu(self.adjacency, k=1).tocoo()
+        order = np.lexsort((upper.col, upper.row))
+        return upper.row[order], upper.col[order], upper.data[order]
+
+    def shared_scenes(self, i, j):
+        """(act, scene) pairs where characters i and j both speak."""
+        ptr, idx = self.incidence.indptr, self.incidence.indices
+        common = np.intersect1d(idx[ptr[i]:ptr[i + 1]], idx[ptr[j]:ptr[j + 1]], assume_unique=True)
+        return [self.scenes[c] for c in common]
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per character pair, in the _network.csv layout."""
+        ptr, idx = self.incidence.indptr, self.incidence.indices
+        row_scenes = [frozenset(idx[ptr[k]:ptr[k + 1]].tolist()) for k in range(len(self.characters))]
+
+        rows = []
+        for i, j, weight in zip(*(a.tolist() for a in self.edges())):
+            scenes = [self.scenes[c] for c in row_scenes[i] & row_scenes[j]]
+            scene_list = sorted(f"{act}.{scene}" for act, scene in scenes)
+            act_nums = sorted({int(a) for a, _ in scenes})
+            scene_nums = sorted({int(s) for _, s in scenes})
+
+            rows.append({
+                "Play": self.title,
+                "Character A": self.characters[i],
+                "Character B": self.characters[j],
+                "Scenes Together": int(weight),
+                "Scenes List": ", ".join(scene_list),
+                "Acts Together": ", ".join(map(str, act_nums)),
+                "Scenes Together (IDs)": ", ".join(map(str, scene_nums)),
+                "Character A ID": i,
+                "Character B ID": j,
+            })
+
+        return pd.DataFrame(rows, columns=NETWORK_COLUMNS)
+
+
+@traced_stage("network")
+def build_cooccurrence_network_clean(merged_play):
+    """
+    Build a cleaned co-occurrence table for a play.
+    Each row: pair of characters, scene count, act-scene list.
+    Names normalized; reversed pairs deduplicated; scenes sorted numerically.
+    Rows come out ordered by (Character A, Character B).
+    """
+    return CooccurrenceNetwork.from_merged(merged_play).to_frame()
+
+
+def build_cooccurrence_adjacency(merged_play):
+    """
+    Sparse shared-scene adjacency for a play, for centrality work.
+    Returns (adjacency CSR matrix, character names in row order).
+    """
+    network = CooccurrenceNetwork.from_merged(merged_play)
+    return network.adjacency, network.characters
+
+
+@_play_job
+def _export_network(w):
+    play_name = w["work_name"]
+    merged = w.get("merged") or PlayBundle.for_work(w).merged
+
+    df_edges = build_cooccurrence_network_clean(merged)
+
+    df_edges = df_edges.sort_values(
+        ["Character A", "Character B"]
+    ).reset_index(drop=True)
+
+    out_path, = play_output_paths(play_name)["network"]
+    _write_csv(df_edges, out_path)
+    return [f"Saved cleaned network for {play_name}: {out_path}"]
+
+
+def build_networks_for_all(works, workers=1):
+    """
+    For each play in `works`, build a cleaned co-occurrence network
+    and save one CSV per play. Reuses w["merged"] when the driver already
+    computed it, otherwise the play's cached PlayBundle.
+    Plays run in parallel when workers > 1.
+    """
+    for log in _run_works(_export_network, works, workers):
+        print("\n".join(log))
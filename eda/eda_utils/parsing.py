@@ -0,0 +1,437 @@
+"""
+Per-play extraction: dramatis personae, per-scene speaker tallies, the
+merged view and the character-level summary table.
+"""
+import numpy as np
+import pandas as pd
+
+from .aliases import AliasIndex, by_name, cast_ids
+from .instrumentation import traced_stage
+from .reader import iter_play_events
+
+
+def extract_title_xml(single_lit_work):
+    xml_tree = single_lit_work["work_xml"]
+    single_lit_work["work_name"] = xml_tree.find('.//TITLE').text 
+
+# -----------------------------------------------
+# 1. Extract character data
+# -----------------------------------------------
+@traced_stage("parse_charcs")
+def extract_charcs_xml(lit_work: list, print_charcs=False):
+    main_charcs = []
+    side_charcs = []
+    title = None
+
+    for event in iter_play_events(lit_work):
+        kind = event[0]
+        if kind == "title":
+            title = (event[1] or "").strip()
+        elif kind == "act":
+            # Dramatis personae always precede the first act.
+            break
+        elif kind == "personae":
+            lines = [l.strip() for l in event[1].itertext() if l.strip()]
+            if lines and "Dramatis Personae" in lines[0]:
+                lines.pop(0)
+
+            group = []
+
+            for line in lines:
+                if line.isupper():
+                    group.append(line)
+                    continue
+
+                if group:
+                    desc = line.strip(". ")
+                    prefix = "(of the group) " if len(group) > 1 else ""
+                    for name in group:
+                        main_charcs.append({"name": name, "desc": prefix + desc})
+                    group = []
+                    continue
+
+                if "," in line:
+                    name_part, desc_part = line.split(",", 1)
+                    name_part, desc_part = name_part.strip(), desc_part.strip(". ")
+                    first_word = name_part.split()[0]
+                    if first_word.isupper():
+                        main_charcs.append({"name": name_part, "desc": desc_part})
+                    else:
+                        side_charcs.append({"desc": line.strip(". ")})
+                    continue
+
+                first_word = line.split()[0]
+                if first_word.isupper():
+                    main_charcs.append({"name": line, "desc": ""})
+                else:
+                    side_charcs.append({"desc": line.strip(". ")})
+
+            for name in group:
+                main_charcs.append({"name": name, "desc": ""})
+
+    if print_charcs:
+        print("=" * 50)
+        print(f"{title}")
+        print("=" * 50)
+        print("Main Characters:")
+        for c in main_charcs:
+            print(f" - {c['name']}: {c['desc']}")
+        print("\nSide Characters:")
+        for c in side_charcs:
+            print(f" - {c['desc']}")
+        print("\n\n")
+
+    return main_charcs, side_charcs
+
+
+# -----------------------------------------------
+# 2. Parse play XML
+# -----------------------------------------------
+@traced_stage("parse")
+def parse_play_xml(xml_tree):
+    """
+    Parses a Shakespeare XML play into a structured dictionary.
+    Includes acts, scenes, and per-scene speech + line counts.
+    """
+    title = "Unknown Title"
+    main_characters = []
+    group_characters = []
+    act_data = []
+
+    for event in iter_play_events(xml_tree):
+        kind = event[0]
+
+        if kind == "speech":
+            _, act_i, scene_i, speakers, lines = event
+            if act_i is None or scene_i is None:
+                continue
+            # name -> [speeches, lines]; a scene lies in a single act, so no per-speaker act set
+            speech_stats = act_data[act_i - 1]["scenes"][scene_i - 1]["speech_stats"]
+            line_count = len(lines)
+            for s in speakers:
+                if not s:
+                    continue
+                tally = speech_stats.get(s.strip())
+                if tally is None:
+                    tally = speech_stats[s.strip()] = [0, 0]
+                tally[0] += 1
+                tally[1] += line_count
+
+        elif kind == "scene":
+            act_data[event[1] - 1]["scenes"].append({"scene": event[2], "speech_stats": {}})
+
+        elif kind == "act":
+            act_data.append({"act": event[1], "scenes": []})
+
+        elif kind == "title":
+            title = event[1]
+
+        elif kind == "personae":
+            personae = event[1]
+            for char in personae.iter("PERSONA"):
+                for l in char.itertext():
+                    l = l.strip()
+                    if not l:
+                        continue
+                    if ',' in l:
+                        main, desc = l.split(',', 1)
+                        if main.split()[0].isupper():
+                            main_characters.append({
+                                "name": main.strip(),
+                                "desc": desc.strip()
+                            })
+                    else:
+                        main_characters.append({"name": l, "desc": ""})
+
+            for gchar in personae.iter("PGROUP"):
+                desc_elem = gchar.find('.//GRPDESCR')
+                desc = desc_elem.text.strip() if desc_elem is not None else "(in group)"
+                for char in gchar.findall('.//PERSONA'):
+                    for l in char.itertext():
+                        l = l.strip()
+                        if not l:
+                            continue
+                        group_characters.append({
+                            "name": l,
+                            "group_desc": f"(in group) {desc}"
+                        })
+
+    # --- Turn per-scene tallies into speaker lists ---
+    for act in act_data:
+        for scene in act["scenes"]:
+            speech_stats = scene.pop("speech_stats")
+            scene["speakers"] = [
+                {
+                    "name": spkr,
+                    "speech_count": speech_stats[spkr][0],
+                    "line_count": speech_stats[spkr][1],
+                    "acts_appeared": 1
+                }
+                for spkr in sorted(speech_stats)
+            ]
+
+    return {
+        "title": title,
+        "acts": act_data,
+        "main_characters": main_characters,
+        "group_characters": group_characters
+    }
+
+
+# -----------------------------------------------
+# 3. Merge data
+# -----------------------------------------------
+@traced_stage("merge")
+def merge_play_data(parsed_play, main_charcs, side_charcs):
+    """
+    Attach a character ID and persona description to every speaker entry.
+    IDs come from the play's AliasIndex; "cast" lists the name of each ID
+    and "cast_main" whether it resolved to a main persona.
+    """
+    aliases = AliasIndex(main_charcs, side_charcs)
+
+    merged_acts = []
+    for act in parsed_play["acts"]:
+        act_entry = {"act": act["act"], "scenes": []}
+        for scene in act["scenes"]:
+            speakers = []
+            for s in scene["speakers"]:
+                char_id = aliases.id(s["name"])
+                speakers.append({
+                    "name": s["name"],
+                    "char_id": char_id,
+                    "speech_count": s.get("speech_count", 0),
+                    "line_count": s.get("line_count", 0),
+                    "acts_appeared": s.get("acts_appeared", 0),
+                    "desc": aliases.descs[char_id]
+                })
+            act_entry["scenes"].append({
+                "scene": scene["scene"],
+                "speakers": speakers
+            })
+        merged_acts.append(act_entry)
+
+    return {
+        "title": parsed_play.get("title", "Unknown Play"),
+        "acts": merged_acts,
+        "characters": main_charcs + side_charcs,
+        "cast": aliases.names,
+        "cast_main": aliases.main
+    }
+
+
+# -----------------------------------------------
+# 4. Summarize quantitative metrics
+# -----------------------------------------------
+
+def _round2(values):
+    """Python's round(x, 2) over an array; np.round differs on some halfway cases."""
+    return np.array([round(v, 2) for v in values.tolist()], dtype=float)
+
+
+def _safe_div(num, den):
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def _bitset(n_rows, n_bits):
+    return np.zeros((n_rows, max(1, (n_bits + 63) // 64)), dtype=np.uint64)
+
+
+def _set_bits(bits, rows, index):
+    np.bitwise_or.at(bits, (rows, index >> 6), np.left_shift(np.uint64(1), (index & 63).astype(np.uint64)))
+
+
+class CharStats:
+    """
+    Per-character totals of one play, indexed by integer character ID.
+
+    speeches / lines are count arrays; scene_bits / act_bits are bitsets
+    (rows of uint64 words) over the scene and act indices a character
+    speaks in, so distinct scenes and acts are popcounts rather than sets.
+    """
+
+    __slots__ = ("names", "speeches", "lines", "scene_bits", "act_bits")
+
+    def __init__(self, names, speeches, lines, scene_bits, act_bits):
+        self.names = names
+        self.speeches = speeches
+        self.lines = lines
+        self.scene_bits = scene_bits
+        self.act_bits = act_bits
+
+    @classmethod
+    def from_columns(cls, names, codes, speeches, lines, scenes, acts, n_scenes, n_acts):
+        """
+        Fold one row per (speaker, scene) entry into per-character totals.
+        `codes` are the IDs into `names`; `scenes` / `acts` are 0-based
+        scene indices and act numbers.
+        """
+        n = len(names)
+        scene_bits = _bitset(n, n_scenes)
+        act_bits = _bitset(n, n_acts)
+        _set_bits(scene_bits, codes, scenes)
+        _set_bits(act_bits, codes, acts)
+        return cls(
+            names,
+            np.bincount(codes, weights=speeches, minlength=n).astype(np.int64),
+            np.bincount(codes, weights=lines, minlength=n).astype(np.int64),
+            scene_bits,
+            act_bits,
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def scenes_appeared(self):
+        return np.bitwise_count(self.scene_bits).sum(axis=1, dtype=np.int64)
+
+    @property
+    def acts_appeared(self):
+        return np.bitwise_count(self.act_bits).sum(axis=1, dtype=np.int64)
+
+
+@traced_stage("summarize")
+def summarize_play_stats(merged_play, main_charcs=None, side_charcs=None, print_summary=True):
+    """Summarizes quantitative statistics from a merged Shakespeare play."""
+    # --- Flatten speaker entries into columns (one pass) ---
+    char_ids = {}
+    alias_ids = {}
+    codes = []
+    speech_col = []
+    line_col = []
+    act_col = []
+    scene_col = []
+    scene_ids = {}
+    act_speech_totals: dict[int, int] = {}
+
+    for act in merged_play["acts"]:
+        act_index = act["act"]
+        act_total = 0
+        for scene in act["scenes"]:
+            scene_id = scene_ids.setdefault((act_index, scene["scene"]), len(scene_ids))
+            for s in scene["speakers"]:
+                speeches = s.get("speech_count", 0)
+                code = char_ids.setdefault(s["name"], len(char_ids))
+                if code == len(alias_ids):
+                    alias_ids[code] = s["char_id"]
+                codes.append(code)
+                speech_col.append(speeches)
+                line_col.append(s.get("line_count", 0))
+                act_col.append(act_index)
+                scene_col.append(scene_id)
+                act_total += speeches
+        act_speech_totals[act_index] = act_total
+
+    # --- Per-name totals ---
+    uniq_names = list(char_ids)
+    n = len(uniq_names)
+    speech_col = np.asarray(speech_col, dtype=np.int64)
+    line_col = np.asarray(line_col, dtype=np.int64)
+    act_col = np.asarray(act_col, dtype=np.int64)
+    stats = CharStats.from_columns(
+        uniq_names, np.asarray(codes, dtype=np.int64), speech_col, line_col,
+        np.asarray(scene_col, dtype=np.int64), act_col,
+        n_scenes=len(scene_ids), n_acts=int(act_col.max()) + 1 if len(act_col) else 1
+    )
+    speeches, lines = stats.speeches, stats.lines
+    scenes, acts_count = stats.scenes_appeared, stats.acts_appeared
+
+    # --- Compute global totals ---
+    total_speeches = int(speech_col.sum())
+    total_lines = int(line_col.sum())
+    total_scenes = sum(len(act["scenes"]) for act in merged_play["acts"])
+    total_acts = len(merged_play["acts"])
+    main_count = len(main_charcs) if main_charcs else 0
+    side_count = len(side_charcs) if side_charcs else 0
+    main_side_ratio = f"{main_count}:{side_count}" if side_count else "N/A"
+
+    # --- Per-name metrics ---
+    speech_share = _round2(_safe_div(speeches, total_speeches) * 100)
+    line_share = _round2(_safe_div(lines, total_lines) * 100)
+    talkativeness = _round2(_safe_div(speeches, scenes))  # avg speeches per scene
+    verbosity = _round2(_safe_div(lines, speeches))       # avg lines per speech
+    focus = _round2(_safe_div(lines, acts_count))
+    breadth = _round2(_safe_div(scenes, total_scenes))
+
+    # main when the persona entry the alias index resolved the name to is a main one
+    cast_main = merged_play["cast_main"]
+    is_main = np.fromiter(
+        (cast_main[alias_ids[code]] for code in range(n)), dtype=bool, count=n
+    )
+
+    # --- Merge names that only differ in spacing/case (they share a character ID) ---
+    char_codes, characters = by_name(merged_play["cast"], list(alias_ids.values()))
+    m = len(characters)
+    group_size = np.bincount(char_codes, minlength=m)
+
+    def group_sum(values):
+        return np.bincount(char_codes, weights=values, minlength=m)
+
+    def group_mean(values):
+        return group_sum(values) / group_size
+
+    acts_max = np.zeros(m, dtype=np.int64)
+    np.maximum.at(acts_max, char_codes, acts_count)
+
+    ids = cast_ids(merged_play["cast"])
+    df = pd.DataFrame({
+        "play": merged_play["title"],
+        "character": np.asarray(characters, dtype=object),
+        "char_id": np.array([ids.get(c, -1) for c in characters], dtype=np.int64),
+        "total_speeches": group_sum(speeches).astype(np.int64),
+        "total_lines": group_sum(lines).astype(np.int64),
+        "scenes_appeared": group_sum(scenes).astype(np.int64),
+        "acts_appeared": acts_max,
+        "speech_share_pct": group_mean(speech_share),
+        "line_share_pct": group_mean(line_share),
+        "avg_speeches_per_scene": group_mean(talkativeness),
+        "avg_lines_per_speech": group_mean(verbosity),
+        "verbosity": group_mean(verbosity),
+        "talkativeness": group_mean(talkativeness),
+        "dominance": group_mean(line_share),
+        "focus": group_mean(focus),
+        "breadth": group_mean(breadth),
+        "play_total_acts": total_acts,
+        "play_total_scenes": total_scenes,
+        "play_total_speeches": total_speeches,
+        "play_total_lines": total_lines,
+        "main_side_ratio": main_side_ratio,
+        # main if any spelling of the character was listed as main
+        "role_type": np.where(group_sum(is_main) > 0, "main", "side").astype(object),
+    })
+    df = df.sort_values("total_lines", ascending=False).reset_index(drop=True)
+
+    summary = {
+        "play_title": merged_play["title"],
+        "total_acts": total_acts,
+        "total_scenes": total_scenes,
+        "total_speeches": total_speeches,
+        "total_lines": total_lines,
+        "act_speech_totals": act_speech_totals,
+        "main_side_ratio": main_side_ratio,
+        "character_df": df
+    }
+
+    # --- Optional printout ---
+    if print_summary:
+        print(f"\n{summary['play_title']}")
+        print("=" * (len(summary['play_title']) + 3))
+        print(
+            f"Acts: {total_acts} | Scenes: {total_scenes} | "
+            f"Total Speeches: {total_speeches} | Total Lines: {total_lines}"
+        )
+        print(f"Main: {main_count} | Side: {side_count} | Ratio: {main_side_ratio}\n")
+
+        print("Act-level speech totals:")
+        for act, total in act_speech_totals.items():
+            print(f"  Act {act}: {total} speeches")
+
+        print("\nTop 10 characters by line count:")
+        print(df.head(10).to_string(index=False))
+
+    return summary
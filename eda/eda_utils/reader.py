@@ -0,0 +1,116 @@
+"""
+Single-pass streaming reader for Shakespeare XML plays.
+"""
+import functools
+import xml.etree.ElementTree as ET
+
+# Elements that are safe to free once their end tag has been handled.
+_CLEARABLE_TAGS = {"SPEECH", "SCENE", "ACT", "PERSONAE", "PROLOGUE", "EPILOGUE", "INDUCT"}
+
+
+def _walk_tree(root):
+    """Yield (event, elem) pairs for an already-parsed tree, like iterparse does."""
+    yield "start", root
+    stack = [(root, iter(root))]
+    while stack:
+        elem, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            yield "end", elem
+        else:
+            yield "start", child
+            stack.append((child, iter(child)))
+
+
+def _play_events(nodes, owned):
+    depth = 0
+    title_seen = False
+    act_i = 0
+    scene_i = 0
+    current_act = None
+    current_scene = None
+
+    for event, elem in nodes:
+        tag = elem.tag
+
+        if event == "start":
+            depth += 1
+            if tag == "ACT":
+                act_i += 1
+                scene_i = 0
+                current_act = act_i
+                yield ("act", act_i)
+            elif tag == "SCENE" and current_act is not None:
+                scene_i += 1
+                current_scene = scene_i
+                yield ("scene", current_act, scene_i)
+            continue
+
+        depth -= 1
+        if tag == "SPEECH":
+            speakers = tuple(s.text for s in elem.iter("SPEAKER"))
+            lines = tuple(l.text for l in elem.iter("LINE"))
+            yield ("speech", current_act, current_scene, speakers, lines)
+        elif tag == "TITLE" and not title_seen:
+            title_seen = True
+            yield ("title", elem.text)
+        elif tag == "PERSONAE":
+            yield ("personae", elem)
+        elif tag == "SCENE":
+            current_scene = None
+        elif tag == "ACT":
+            current_act = None
+            current_scene = None
+
+        if owned and (tag in _CLEARABLE_TAGS or depth == 1):
+            elem.clear()
+
+
+def iter_play_events(source):
+    """
+    Walks a Shakespeare XML play once and yields its structure as events.
+
+    `source` can be a file path, an open file, or an already-parsed tree
+    (what nltk.corpus.shakespeare.xml returns). Paths and files are read with
+    iterparse and each finished SPEECH, SCENE and ACT is freed right away, so
+    the whole tree never has to stay in memory.
+
+    Events are tuples:
+        ("title", text)                                first TITLE in the play
+        ("personae", element)                          the PERSONAE block
+        ("act", act_i)
+        ("scene", act_i, scene_i)
+        ("speech", act_i, scene_i, speakers, lines)    raw SPEAKER / LINE texts
+
+    Acts and scenes are numbered from 1; a speech outside any act or scene
+    (e.g. a prologue) gets None for those. Elements handed out with an event
+    are only valid until the next event is requested.
+    """
+    if isinstance(source, ET.ElementTree):
+        source = source.getroot()
+
+    if ET.iselement(source):
+        yield from _play_events(_walk_tree(source), owned=False)
+    elif hasattr(source, "read"):
+        yield from _play_events(ET.iterparse(source, events=("start", "end")), owned=True)
+    else:
+        with open(source, "rb") as fh:
+            yield from _play_events(ET.iterparse(fh, events=("start", "end")), owned=True)
+
+
+def play_title(source, default="Unknown Play") -> str:
+    """The play's TITLE, reading no further into the XML than that element."""
+    for event in iter_play_events(source):
+        if event[0] == "title":
+            return event[1]
+    return default
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def normalize_name(name: str) -> str:
+    """
+    Uppercase, trim, and collapse multiple spaces. Memoized: a play repeats
+    the same few dozen speaker strings thousands of times.
+    """
+    return " ".join(str(name).strip().upper().split())
@@ -0,0 +1,97 @@
+"""
+Corpus runner: fans per-play jobs out over a process pool, results in input order.
+"""
+import functools
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from . import instrumentation
+from .instrumentation import _TracedJob, stage, trace_play
+
+# Work entries that per-play jobs may read; anything else (e.g. the
+# PlayBundle) stays in the parent process.
+_JOB_KEYS = ("work_xml", "work_name", "main_charcs", "side_charcs", "merged")
+
+
+def run_per_play(func, items, workers=1):
+    """
+    Apply `func` to every item, fanning out over a ProcessPoolExecutor when
+    workers > 1 (None = one per CPU). Results always come back in input
+    order, so merged outputs match the serial run exactly.
+    """
+    items = list(items)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return list(iter_per_play(func, items, min(workers, len(items))))
+
+
+def iter_per_play(func, items, workers=1, window=None):
+    """
+    Lazy run_per_play: yields results in input order as they complete.
+    `items` may be any iterable (e.g. a generator over play paths); at most
+    `window` items (default 4 per worker) are in flight at once, so memory
+    stays bounded however long the corpus is.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    job = func if instrumentation._TRACE is None else _TracedJob(func)
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(job, item) for item in itertools.islice(items, window or 4 * workers))
+        while pending:
+            result = pending.popleft().result()
+            for item in itertools.islice(items, 1):
+                pending.append(pool.submit(job, item))
+            if instrumentation._TRACE is not None:
+                result, records = result
+                instrumentation._TRACE.extend(records)
+            yield result
+
+
+def _play_job(func):
+    """Per-play job: traced stages inside it are attributed to w["work_name"]."""
+    @functools.wraps(func)
+    def wrapper(w):
+        with trace_play(w.get("work_name")):
+            return func(w)
+    return wrapper
+
+
+COMBINED_STORY_STATS_PATH = "../csv/all_plays_story_stats.csv"
+COMBINED_CHAR_STATS_PATH = "../csv/all_plays_char_stats.csv"
+
+
+def play_output_paths(play_name, csv_dir="../csv"):
+    """Per-play CSV files written by each exporter, keyed by artifact kind."""
+    base_name = play_name.lower().replace(" ", "_").replace("'", "")
+    return {
+        # the network file has always kept apostrophes in its name
+        "network": [f"{csv_dir}/{play_name.lower().replace(' ', '_')}_network.csv"],
+        "speeches": [f"{csv_dir}/{base_name}_speeches.csv", f"{csv_dir}/{base_name}_lines.csv"],
+        "story": [f"{csv_dir}/{base_name}_story_stats.csv", f"{csv_dir}/{base_name}_layout.csv"],
+    }
+
+
+def _write_csv(df, path):
+    with stage("csv_write") as record:
+        df.to_csv(path, index=False)
+        record.rows = len(df)
+
+
+def _job_works(works, workers=1):
+    """`works` as sent to per-play jobs: slimmed to _JOB_KEYS when they go to a pool."""
+    if workers is not None and workers <= 1:
+        return works
+    return ({k: w[k] for k in _JOB_KEYS if k in w} for w in works)
+
+
+def _run_works(func, works, workers=1):
+    """run_per_play over `works`, shipping only the entries jobs need to the pool."""
+    return run_per_play(func, _job_works(works, workers), workers)
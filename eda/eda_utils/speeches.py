@@ -0,0 +1,106 @@
+"""
+Speech- and line-level tables (_speeches.csv / _lines.csv).
+"""
+import pandas as pd
+
+from .aliases import cast_ids
+from .instrumentation import traced_stage
+from .reader import iter_play_events, normalize_name
+from .runner import _play_job, _run_works, _write_csv, play_output_paths
+
+
+@traced_stage("speeches")
+def extract_speeches_and_lines_by_scene(xml_tree):
+    """
+    Extracts both speech-level and line-level data from a play XML tree.
+
+    Returns two DataFrames:
+        1. speeches_df: Play, Act, Scene, Character, Line Count, Text, Character ID
+        2. lines_df: Play, Act, Scene, Character, Line Number, Text, Character ID
+
+    Character ID is the play's aliases.cast_ids numbering, counted over every
+    speaker (including those of speeches without lines), as in the merged cast.
+    """
+    title = "Unknown Play"
+
+    speech_rows = []
+    line_rows = []
+    cast = set()
+
+    for event in iter_play_events(xml_tree):
+        if event[0] == "title":
+            title = event[1]
+            continue
+        if event[0] != "speech":
+            continue
+
+        _, act_i, scene_i, raw_speakers, raw_lines = event
+        if act_i is None or scene_i is None:
+            continue
+
+        speakers = [normalize_name(s) for s in raw_speakers if s]
+        lines = [l.strip() for l in raw_lines if l and l.strip()]
+        cast.update(speakers)
+        if not speakers or not lines:
+            continue
+
+        # Combine all lines for speech-level text
+        speech_text = " ".join(lines)
+        line_count = len(speech_text.split())
+
+        for speaker in speakers:
+            # Add speech-level record
+            speech_rows.append({
+                "Play": title,
+                "Act": act_i,
+                "Scene": scene_i,
+                "Character": speaker,
+                "Line Count": line_count,
+                "Text": speech_text
+            })
+
+            # Add line-level records
+            for line_num, line_text in enumerate(lines, start=1):
+                line_rows.append({
+                    "Play": title,
+                    "Act": act_i,
+                    "Scene": scene_i,
+                    "Character": speaker,
+                    "Line Number": line_num,
+                    "Text": line_text
+                })
+
+    ids = cast_ids(cast)
+    speeches_df, lines_df = pd.DataFrame(speech_rows), pd.DataFrame(line_rows)
+    for df in (speeches_df, lines_df):
+        if len(df):
+            df["Character ID"] = df["Character"].map(ids).fillna(-1).astype("int64")
+    return speeches_df, lines_df
+
+
+@_play_job
+def _export_speeches_and_lines(w):
+    xml_tree = w["work_xml"]
+    play_name = w["work_name"]
+    log = [f"Extracting speeches and lines for {play_name}..."]
+
+    speeches_df, lines_df = extract_speeches_and_lines_by_scene(xml_tree)
+
+    speech_path, line_path = play_output_paths(play_name)["speeches"]
+
+    _write_csv(speeches_df, speech_path)
+    _write_csv(lines_df, line_path)
+
+    log.append(f"Saved {speech_path} ({len(speeches_df)} speeches)")
+    log.append(f"Saved {line_path} ({len(lines_df)} lines)")
+    return log
+
+
+def extract_all_speeches_and_lines(works, workers=1):
+    """
+    Extract speech-level and line-level data for each play.
+    Saves both as separate CSVs per play.
+    Plays run in parallel when workers > 1.
+    """
+    for log in _run_works(_export_speeches_and_lines, works, workers):
+        print("\n".join(log))
@@ -0,0 +1,213 @@
+"""
+Play-level story stats and scene layout (_story_stats.csv / _layout.csv).
+"""
+import os
+
+import pandas as pd
+
+from .column_store import ColumnStore
+from .instrumentation import stage, traced_stage
+from .reader import iter_play_events
+from .runner import (
+    COMBINED_STORY_STATS_PATH, _job_works, _play_job, _run_works, _write_csv,
+    iter_per_play, play_output_paths
+)
+
+
+def count_story_lines(xml_tree):
+    """
+    Count only dialogue <LINE> elements inside <SPEECH> blocks.
+    Returns (play_title, total_lines, total_speeches).
+    """
+    title = "Unknown Play"
+    line_count = 0
+    speech_count = 0
+
+    for event in iter_play_events(xml_tree):
+        if event[0] == "speech":
+            spoken = sum(1 for l in event[4] if l and l.strip())
+            if spoken:
+                line_count += spoken
+                speech_count += 1
+        elif event[0] == "title":
+            title = event[1]
+
+    return title, line_count, speech_count
+
+
+@traced_stage("story_layout")
+def _scan_story_layout(xml_tree):
+    """
+    Single pass over a play for create_story_stats.
+    Returns (scenes_per_act, line_count, speech_count, layout_rows), where the
+    totals cover every speech in the play and layout_rows hold one entry per
+    act/scene with its speeches, dialogue lines and unique speakers.
+    """
+    scenes_per_act = []
+    layout_rows = []
+    scene_speakers = {}
+    line_count = 0
+    speech_count = 0
+
+    for event in iter_play_events(xml_tree):
+        kind = event[0]
+
+        if kind == "speech":
+            _, act_i, scene_i, speakers, lines = event
+            spoken = sum(1 for l in lines if l and l.strip())
+            if not spoken:
+                continue
+            line_count += spoken
+            speech_count += 1
+
+            if act_i is None or scene_i is None:
+                continue
+            row = layout_rows[-1]
+            row["Speeches"] += 1
+            row["Dialogue Lines"] += spoken
+            scene_speakers[(act_i, scene_i)].update(s.strip().upper() for s in speakers if s)
+
+        elif kind == "scene":
+            _, act_i, scene_i = event
+            scenes_per_act[-1] += 1
+            scene_speakers[(act_i, scene_i)] = set()
+            layout_rows.append({
+                "Act": act_i,
+                "Scene": scene_i,
+                "Speeches": 0,
+                "Dialogue Lines": 0,
+                "Unique Speakers": 0
+            })
+
+        elif kind == "act":
+            scenes_per_act.append(0)
+
+    for row in layout_rows:
+        row["Unique Speakers"] = len(scene_speakers[(row["Act"], row["Scene"])])
+
+    return scenes_per_act, line_count, speech_count, layout_rows
+
+
+def count_characters(lit_work: dict):
+    """
+    Count main and side characters defined in the dramatis personae.
+    """
+    main_char_ct = len(lit_work.get("main_charcs", []))
+    side_char_ct = len(lit_work.get("side_charcs", []))
+    total_char_ct = main_char_ct + side_char_ct
+    return main_char_ct, side_char_ct, total_char_ct
+
+
+@_play_job
+def _export_story_stats(lit_work):
+    xml_tree = lit_work["work_xml"]
+    play_title = lit_work["work_name"]
+    log = []
+
+    # -----------------------
+    # Count global structure
+    # -----------------------
+    scenes_per_act, line_count, speech_count, scene_rows = _scan_story_layout(xml_tree)
+    act_count = len(scenes_per_act)
+    scene_count = sum(scenes_per_act)
+
+    # Character counts
+    main_ct, side_ct, total_ct = count_characters(lit_work)
+
+    # Derived averages
+    avg_lines_scene = round(line_count / scene_count, 2) if scene_count else 0
+    avg_speeches_scene = round(speech_count / scene_count, 2) if scene_count else 0
+    avg_lines_speech = round(line_count / speech_count, 2) if speech_count else 0
+
+    # -----------------------
+    # Play-level summary
+    # -----------------------
+    summary_df = pd.DataFrame([{
+        "Play": play_title,
+        "Acts": act_count,
+        "Scenes": scene_count,
+        "Speeches": speech_count,
+        "Dialogue Lines": line_count,
+        "Main Characters": main_ct,
+        "Side Characters": side_ct,
+        "Total Characters": total_ct,
+        "Avg Lines/Scene": avg_lines_scene,
+        "Avg Speeches/Scene": avg_speeches_scene,
+        "Avg Lines/Speech": avg_lines_speech
+    }])
+
+    story_stats_path, layout_path = play_output_paths(play_title)["story"]
+    _write_csv(summary_df, story_stats_path)
+    log.append(f"Saved play summary: {story_stats_path}")
+
+    # -----------------------
+    # Scene-level layout (with cast size)
+    # -----------------------
+    for act_i, n_scenes in enumerate(scenes_per_act, start=1):
+        log.append(f"{play_title} - Act {act_i}: {n_scenes} scenes")
+
+    layout_rows = [{"Play": play_title, **row} for row in scene_rows]
+    layout_df = pd.DataFrame(layout_rows)
+
+    # Aggregate summaries per act
+    act_summary = (
+        layout_df.groupby("Act")
+        .agg({
+            "Scene": "count",
+            "Speeches": "sum",
+            "Dialogue Lines": "sum",
+            "Unique Speakers": "mean"
+        })
+        .rename(columns={"Scene": "Scenes", "Unique Speakers": "Avg Unique Speakers"})
+        .reset_index()
+    )
+
+    log.append("\nAct-Level Summary:")
+    log.append(act_summary.to_string(index=False))
+
+    _write_csv(layout_df, layout_path)
+    log.append(f"Saved detailed layout: {layout_path}\n")
+
+    return summary_df, log
+
+
+def create_story_stats(works: list, workers=1, store_dir=None):
+    """
+    Creates both:
+    - Play-level quantitative summaries (acts, scenes, speeches, etc.)
+    - Scene-level layout summaries (act/scene + speeches, lines, unique characters)
+    For each play in the list.
+    Saves all outputs into ../csv/.
+    Plays run in parallel when workers > 1; the combined table keeps the
+    order of `works` either way.
+    With store_dir, play summaries are streamed into a ColumnStore there
+    instead of being collected in memory, and the store is returned.
+    """
+    os.makedirs("../csv", exist_ok=True)
+    combined_summary_path = COMBINED_STORY_STATS_PATH
+
+    if store_dir is not None:
+        with ColumnStore.create(store_dir) as store:
+            for summary_df, log in iter_per_play(_export_story_stats, _job_works(works, workers), workers):
+                store.append(summary_df)
+                print("\n".join(log))
+        with stage("csv_write") as record:
+            store.to_csv(combined_summary_path)
+            record.rows = len(store)
+        print(f"Saved combined story summary for all plays: {combined_summary_path}")
+        return store
+
+    all_play_summaries = []  # store all play-level summaries together
+
+    for summary_df, log in _run_works(_export_story_stats, works, workers):
+        all_play_summaries.append(summary_df)
+        print("\n".join(log))
+
+    # -----------------------
+    # Combine all play-level summaries
+    # -----------------------
+    combined_summary = pd.concat(all_play_summaries, ignore_index=True)
+    _write_csv(combined_summary, combined_summary_path)
+    print(f"Saved combined story summary for all plays: {combined_summary_path}")
+
+    return combined_summary
@@ -0,0 +1,199 @@
+"""
+Corpus-wide, incrementally updated TF-IDF features for characters.
+
+Each (play, character) is one document: all of the character's lines from
+_lines.csv. Terms (unigrams + bigrams by default) are hashed into a fixed
+number of columns, so adding a play never refits or reshapes anything; the
+store only appends that play's sparse count rows and bumps the running
+document frequencies. IDF weighting is applied at query time, matching
+sklearn's TfidfVectorizer (smooth idf, sublinear_tf off, l2 rows) up to
+the odd hash collision between terms.
+"""
+import glob
+import json
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, ENGLISH_STOP_WORDS
+from sklearn.utils import murmurhash3_32
+
+from eda_utils import PLAY_CACHE_DIR
+
+LEXICAL_STORE_DIR = os.path.join(PLAY_CACHE_DIR, "lexical")
+CUSTOM_STOP_WORDS = {"thou", "thy", "thee", "ll"}
+
+
+class LexicalFeatureStore:
+    """Sparse character x hashed-term count matrix with running document frequencies."""
+
+    def __init__(self, n_features=2 ** 20, ngram_range=(1, 2), stop_words=None):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        if stop_words is None:
+            stop_words = set(ENGLISH_STOP_WORDS) | CUSTOM_STOP_WORDS
+        self.stop_words = sorted(stop_words)
+
+        self._analyzer = CountVectorizer(
+            lowercase=True, stop_words=self.stop_words, ngram_range=self.ngram_range
+        ).build_analyzer()
+        self._index_of = {}                  # term -> hashed column
+        self.terms = {}                      # hashed column -> first term seen there
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.blocks = {}                     # play -> (characters, CSR counts)
+        self._rows = None
+
+    # -----------------------
+    # Building
+    # -----------------------
+    def _column(self, term):
+        col = self._index_of.get(term)
+        if col is None:
+            col = murmurhash3_32(term, positive=True) % self.n_features
+            self._index_of[term] = col
+            self.terms.setdefault(col, term)
+        return col
+
+    def _count_rows(self, texts):
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            counts = Counter(self._column(t) for t in self._analyzer(text))
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        m = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.int32), np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(texts), self.n_features)
+        )
+        m.sum_duplicates()
+        return m
+
+    def remove_play(self, play):
+        if play not in self.blocks:
+            return
+        _, counts = self.blocks.pop(play)
+        self.doc_freq -= np.bincount(counts.indices, minlength=self.n_features)
+        self._rows = None
+
+    def add_lines(self, lines_df):
+        """
+        Add (or replace) every play in a _lines.csv-style frame. Only those
+        plays' rows are counted; nothing else is touched.
+        """
+        for play, play_lines in lines_df.groupby("Play", sort=False):
+            self.remove_play(play)
+            docs = play_lines.groupby("Character", sort=True)["Text"].apply(
+                lambda lines: " ".join(lines.astype(str))
+            )
+            counts = self._count_rows(docs.tolist())
+            self.doc_freq += np.bincount(counts.indices, minlength=self.n_features)
+            self.blocks[play] = (docs.index.tolist(), counts)
+        self._rows = None
+        return self
+
+    @classmethod
+    def from_csv_dir(cls, csv_dir="../csv", **kwargs):
+        store = cls(**kwargs)
+        for path in sorted(glob.glob(os.path.join(csv_dir, "*_lines.csv"))):
+            store.add_lines(pd.read_csv(path))
+        return store
+
+    # -----------------------
+    # Querying
+    # -----------------------
+    @property
+    def n_docs(self):
+        return sum(len(chars) for chars, _ in self.blocks.values())
+
+    def _row_index(self):
+        if self._rows is None:
+            self._rows = {}
+            for play, (chars, _) in self.blocks.items():
+                for i, c in enumerate(chars):
+                    self._rows[(play, c)] = i
+        return self._rows
+
+    def idf(self):
+        n = self.n_docs
+        return np.log((1 + n) / (1 + self.doc_freq)) + 1
+
+    def _term_mask(self, min_df, max_df):
+        n = self.n_docs
+        max_count = max_df * n if isinstance(max_df, float) else max_df
+        return (self.doc_freq >= min_df) & (self.doc_freq <= max_count)
+
+    def _tfidf(self, counts, min_df=1, max_df=1.0):
+        out = counts.astype(float).tocsr()
+        weights = self.idf() * self._term_mask(min_df, max_df)
+        out.data *= weights[out.indices]
+        out.eliminate_zeros()
+        norms = np.sqrt(out.multiply(out).sum(axis=1)).A1
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ out
+
+    def feature_matrix(self, min_df=1, max_df=1.0):
+        """
+        (CSR tf-idf matrix, DataFrame of play/character per row) for the whole
+        corpus, ready to hstack onto the structural features.
+        """
+        keys = [(p, c) for p, (chars, _) in self.blocks.items() for c in chars]
+        if not keys:
+            return sparse.csr_matrix((0, self.n_features)), pd.DataFrame(columns=["play", "character"])
+        counts = sparse.vstack([m for _, m in self.blocks.values()], format="csr")
+        return self._tfidf(counts, min_df, max_df).tocsr(), pd.DataFrame(keys, columns=["play", "character"])
+
+    def top_terms_for_character(self, character, play=None, n=10, min_df=2, max_df=0.9):
+        """Top-n tf-idf terms for a character; `play` is needed when the name occurs in several plays."""
+        if play is None:
+            plays = [p for p, (chars, _) in self.blocks.items() if character in chars]
+            if not plays:
+                raise KeyError(character)
+            if len(plays) > 1:
+                raise ValueError(f"{character} appears in several plays, pass play=: {plays}")
+            play = plays[0]
+
+        row = self._row_index()[(play, character)]
+        vec = self._tfidf(self.blocks[play][1][row], min_df, max_df).tocsr()
+        cols, vals = vec.indices, vec.data
+        top = np.argsort(-vals, kind="stable")[:n]
+        return pd.Series(vals[top], index=[self.terms[c] for c in cols[top]], name=character)
+
+    # -----------------------
+    # Persistence
+    # -----------------------
+    def save(self, path=LEXICAL_STORE_DIR):
+        os.makedirs(path, exist_ok=True)
+        plays = list(self.blocks)
+        counts = [self.blocks[p][1] for p in plays]
+        if counts:
+            sparse.save_npz(os.path.join(path, "counts.npz"), sparse.vstack(counts, format="csr"))
+        np.save(os.path.join(path, "doc_freq.npy"), self.doc_freq)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as fh:
+            json.dump({
+                "n_features": self.n_features,
+                "ngram_range": list(self.ngram_range),
+                "stop_words": self.stop_words,
+                "plays": plays,
+                "characters": [self.blocks[p][0] for p in plays],
+                "terms": {str(c): t for c, t in self.terms.items()},
+            }, fh, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path=LEXICAL_STORE_DIR):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        store = cls(meta["n_features"], meta["ngram_range"], meta["stop_words"])
+        store.doc_freq = np.load(os.path.join(path, "doc_freq.npy"))
+        store.terms = {int(c): t for c, t in meta["terms"].items()}
+
+        if meta["plays"]:
+            counts = sparse.load_npz(os.path.join(path, "counts.npz")).tocsr()
+            start = 0
+            for play, chars in zip(meta["plays"], meta["characters"]):
+                store.blocks[play] = (chars, counts[start:start + len(chars)])
+                start += len(chars)
+        return store
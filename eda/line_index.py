@@ -0,0 +1,309 @@
+"""
+Inverted index over the dialogue in every _lines.csv.
+
+Built once from the csv/ outputs, then opened memory-mapped:
+
+- per row of the _lines.csv files: play, act, scene and character codes,
+  the line number, and the row's text as a span of a UTF-8 arena
+- per term: a slice of the postings arrays holding (row, token position)
+  for every occurrence, sorted by row then position
+
+Terms are lowercased words (apostrophes kept inside words, so "o'er" stays
+one term). Queries combine terms, "quoted phrases", AND / OR / NOT and
+parentheses; adjacent terms are ANDed:
+
+    index = LineIndex.open()
+    index.search("moor", character="IAGO")
+    index.search('"my lord" AND NOT horatio', play="The Tragedy of Hamlet, Prince of Denmark", act=1)
+    index.scenes("blood")
+"""
+import glob
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from eda_utils import PLAY_CACHE_DIR
+
+LINE_INDEX_DIR = os.path.join(PLAY_CACHE_DIR, "line_index")
+LINE_INDEX_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)*")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\()|(\))|([^\s()"]+)')
+_POS_BITS = 20  # (row, position) pairs are packed as row << _POS_BITS | position
+
+_ARRAYS = {
+    # per _lines.csv row
+    "row_play": np.int32,
+    "row_act": np.int16,
+    "row_scene": np.int16,
+    "row_char": np.int32,
+    "row_line": np.int32,
+    "row_start": np.int64,    # byte offsets into text.bin
+    "row_end": np.int64,
+    # per term, into the postings
+    "term_ptr": np.int64,
+    # per occurrence, grouped by term
+    "post_row": np.int64,
+    "post_pos": np.int32,
+}
+
+
+def tokenize(text) -> list:
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def build_line_index(csv_dir="../csv", out_dir=LINE_INDEX_DIR):
+    """Index every *_lines.csv in csv_dir and write the arrays to out_dir."""
+    paths = sorted(glob.glob(os.path.join(csv_dir, "*_lines.csv")))
+    frames = [pd.read_csv(p, keep_default_na=False) for p in paths]
+    lines = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=["Play", "Act", "Scene", "Character", "Line Number", "Text"]
+    )
+
+    play_codes, plays = pd.factorize(lines["Play"].astype(str))
+    char_codes, characters = pd.factorize(lines["Character"].astype(str))
+
+    arena = bytearray()
+    starts, ends = [], []
+    tokens, token_rows, token_pos = [], [], []
+    for row, text in enumerate(lines["Text"].astype(str).tolist()):
+        starts.append(len(arena))
+        arena += text.encode("utf-8")
+        ends.append(len(arena))
+        terms = tokenize(text)
+        tokens.extend(terms)
+        token_rows.extend([row] * len(terms))
+        token_pos.extend(range(len(terms)))
+
+    vocab, term_ids = np.unique(np.asarray(tokens, dtype=str), return_inverse=True)
+    token_rows = np.asarray(token_rows, dtype=np.int64)
+    token_pos = np.asarray(token_pos, dtype=np.int32)
+    # postings ordered by term, then row, then position (rows/positions are already ascending)
+    order = np.argsort(term_ids, kind="stable")
+    term_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=len(vocab)), out=term_ptr[1:])
+
+    arrays = {
+        "row_play": play_codes,
+        "row_act": lines["Act"].to_numpy(),
+        "row_scene": lines["Scene"].to_numpy(),
+        "row_char": char_codes,
+        "row_line": lines["Line Number"].to_numpy(),
+        "row_start": starts,
+        "row_end": ends,
+        "term_ptr": term_ptr,
+        "post_row": token_rows[order],
+        "post_pos": token_pos[order],
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    for name, dtype in _ARRAYS.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), np.asarray(arrays[name], dtype=dtype))
+    with open(os.path.join(out_dir, "text.bin"), "wb") as fh:
+        fh.write(arena)
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump({
+            "version": LINE_INDEX_VERSION,
+            "sources": [os.path.basename(p) for p in paths],
+            "plays": list(plays),
+            "characters": list(characters),
+            "vocab": list(vocab),
+        }, fh, ensure_ascii=False)
+
+    return LineIndex.open(out_dir)
+
+
+class LineIndex:
+    """Read side of the index; see the module docstring for the layout and query syntax."""
+
+    def __init__(self, path, meta, arrays, text):
+        self.path = path
+        self.plays = meta["plays"]
+        self.characters = meta["characters"]
+        self.vocab = meta["vocab"]
+        self.term_ids = {term: i for i, term in enumerate(self.vocab)}
+        self.text = text
+        for name, arr in arrays.items():
+            setattr(self, name, arr)
+
+    @classmethod
+    def open(cls, path=LINE_INDEX_DIR):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("version") != LINE_INDEX_VERSION:
+            raise ValueError(f"{path} was written by a different LineIndex version; rebuild it.")
+
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in _ARRAYS
+        }
+        text_path = os.path.join(path, "text.bin")
+        if os.path.getsize(text_path):
+            text = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            text = np.zeros(0, dtype=np.uint8)
+        return cls(path, meta, arrays, text)
+
+    def __len__(self):
+        return len(self.row_play)
+
+    # -----------------------
+    # Postings
+    # -----------------------
+    def _postings(self, term):
+        i = self.term_ids.get(term)
+        if i is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        lo, hi = self.term_ptr[i], self.term_ptr[i + 1]
+        return self.post_row[lo:hi], self.post_pos[lo:hi]
+
+    def term_rows(self, term) -> np.ndarray:
+        """Sorted row ids containing `term`."""
+        rows, _ = self._postings(term.lower())
+        return np.unique(rows)
+
+    def phrase_rows(self, phrase) -> np.ndarray:
+        """Sorted row ids containing the words of `phrase` consecutively."""
+        terms = tokenize(phrase)
+        if not terms:
+            return np.zeros(0, dtype=np.int64)
+        if len(terms) == 1:
+            return self.term_rows(terms[0])
+        # align every term's occurrences on the phrase start and intersect
+        keys = None
+        for offset, term in enumerate(terms):
+            rows, pos = self._postings(term)
+            start = pos.astype(np.int64) - offset
+            packed = (rows[start >= 0] << _POS_BITS) | start[start >= 0]
+            keys = packed if keys is None else np.intersect1d(keys, packed, assume_unique=True)
+            if not len(keys):
+                break
+        return np.unique(keys >> _POS_BITS)
+
+    # -----------------------
+    # Queries
+    # -----------------------
+    def _parse(self, query):
+        """Query string -> sorted row ids. OR binds loosest, then AND, then NOT."""
+        tokens = []
+        for phrase, lpar, rpar, word in _QUERY_RE.findall(query):
+            if phrase:
+                tokens.append(("phrase", phrase))
+            elif lpar or rpar:
+                tokens.append((lpar or rpar, None))
+            elif word in ("AND", "OR", "NOT"):
+                tokens.append((word, None))
+            else:
+                tokens.append(("phrase", word))
+        everything = np.arange(len(self), dtype=np.int64)
+        pos = 0
+
+        def peek():
+            return tokens[pos][0] if pos < len(tokens) else None
+
+        def take():
+            nonlocal pos
+            pos += 1
+            return tokens[pos - 1]
+
+        def parse_or():
+            rows = parse_and()
+            while peek() == "OR":
+                take()
+                rows = np.union1d(rows, parse_and())
+            return rows
+
+        def parse_and():
+            rows = parse_not()
+            while peek() in ("AND", "NOT", "phrase", "("):
+                if peek() == "AND":
+                    take()
+                rows = np.intersect1d(rows, parse_not(), assume_unique=True)
+            return rows
+
+        def parse_not():
+            if peek() == "NOT":
+                take()
+                return np.setdiff1d(everything, parse_not(), assume_unique=True)
+            if peek() == "(":
+                take()
+                rows = parse_or()
+                if peek() != ")":
+                    raise ValueError(f"Unbalanced parentheses in query: {query!r}")
+                take()
+                return rows
+            if peek() != "phrase":
+                raise ValueError(f"Unexpected {peek() or 'end of query'} in query: {query!r}")
+            return self.phrase_rows(take()[1])
+
+        rows = parse_or()
+        if pos != len(tokens):
+            raise ValueError(f"Unexpected {peek()} in query: {query!r}")
+        return rows
+
+    def _filter(self, rows, play=None, act=None, scene=None, character=None):
+        for codes, wanted, names in (
+            (self.row_play, play, self.plays),
+            (self.row_char, character, self.characters),
+            (self.row_act, act, None),
+            (self.row_scene, scene, None),
+        ):
+            if wanted is None:
+                continue
+            wanted = [wanted] if isinstance(wanted, (str, int, np.integer)) else list(wanted)
+            if names is not None:
+                wanted = [names.index(w) for w in wanted if w in names]
+            rows = rows[np.isin(np.asarray(codes)[rows], wanted)]
+        return rows
+
+    def match(self, query, play=None, act=None, scene=None, character=None) -> np.ndarray:
+        """Row ids matching `query` and the filters (each a value or a list of values)."""
+        return self._filter(self._parse(query), play, act, scene, character)
+
+    def rows_frame(self, rows) -> pd.DataFrame:
+        """Rows in the _lines.csv layout."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return pd.DataFrame({
+            "Play": np.asarray(self.plays, dtype=object)[np.asarray(self.row_play)[rows]],
+            "Act": np.asarray(self.row_act)[rows].astype(np.int64),
+            "Scene": np.asarray(self.row_scene)[rows].astype(np.int64),
+            "Character": np.asarray(self.characters, dtype=object)[np.asarray(self.row_char)[rows]],
+            "Line Number": np.asarray(self.row_line)[rows].astype(np.int64),
+            "Text": [self.text[s:e].tobytes().decode("utf-8") for s, e in zip(self.row_start[rows], self.row_end[rows])],
+        })
+
+    def search(self, query, play=None, act=None, scene=None, character=None) -> pd.DataFrame:
+        """Matching lines, in corpus order, as a _lines.csv-style frame."""
+        return self.rows_frame(self.match(query, play, act, scene, character))
+
+    def scenes(self, query, play=None, act=None, character=None) -> pd.DataFrame:
+        """Play / Act / Scene with the number of matching lines, for every scene with a match."""
+        rows = self.match(query, play, act, None, character)
+        hits = pd.DataFrame({
+            "play": np.asarray(self.row_play)[rows],
+            "Act": np.asarray(self.row_act)[rows].astype(np.int64),
+            "Scene": np.asarray(self.row_scene)[rows].astype(np.int64),
+        })
+        out = hits.groupby(["play", "Act", "Scene"], sort=True).size().rename("Matches").reset_index()
+        out.insert(0, "Play", np.asarray(self.plays, dtype=object)[out.pop("play").to_numpy()])
+        return out
+
+    def term_counts(self, terms, by="character") -> pd.DataFrame:
+        """
+        Occurrences of each term per (play, character) or, with by="play",
+        per play, for feature extraction. Columns are the terms.
+        """
+        keys = ["play", "character"] if by == "character" else ["play"]
+        plays = np.asarray(self.plays, dtype=object)
+        characters = np.asarray(self.characters, dtype=object)
+        counts = {}
+        for term in terms:
+            rows, _ = self._postings(term.lower())
+            hits = pd.DataFrame({
+                "play": plays[np.asarray(self.row_play)[rows]],
+                "character": characters[np.asarray(self.row_char)[rows]],
+            })
+            counts[term] = hits.groupby(keys).size()
+        return pd.DataFrame(counts).fillna(0).astype(np.int64)
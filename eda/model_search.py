@@ -0,0 +1,281 @@
+"""
+Cross-validated model search for the archetype classifiers.
+
+Every (feature set, model, hyperparameters) combination is scored with
+repeated stratified k-fold cross-validation, using successive halving over
+the CV repeats: all configurations get one repeat, only the best 1/eta
+of them get more, and so on until the survivors have n_repeats. Scores from
+earlier rungs are kept, never recomputed.
+
+Each fold fit is one job on eda_utils.run_per_play's process pool. Feature
+matrices and labels are built once from all_plays_char_stats.csv (+ the
+archetype labels and, for the centrality / dynamics / stylometry /
+temporal sets, the centrality, scene-window dynamics, stylometry and
+act-by-act temporal network tables) and
+cached as .npy files keyed by their content, so workers memory-map them
+instead of receiving copies, and later searches skip the rebuild.
+
+    python model_search.py --workers 8 --repeats 5
+"""
+import argparse
+import ast
+import functools
+import hashlib
+import itertools
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from centrality import CENTRALITY_COLUMNS, add_centrality_features
+from dynamics import DYNAMICS_COLUMNS, add_dynamics_features
+from eda_utils import PLAY_CACHE_DIR, run_per_play
+from stylometry import STYLOMETRY_COLUMNS, add_stylometry_features
+from temporal_networks import TEMPORAL_COLUMNS, add_temporal_features
+
+FEATURE_CACHE_DIR = os.path.join(PLAY_CACHE_DIR, "features")
+
+# feature sets used so far in base_models.ipynb, plus network centrality, scene dynamics, stylometry
+# and act-by-act network evolution
+BASE_FEATURES = [
+    "total_speeches", "total_lines", "scenes_appeared", "acts_appeared",
+    "speech_share_pct", "line_share_pct", "avg_speeches_per_scene", "avg_lines_per_speech",
+    "verbosity", "talkativeness", "dominance", "focus", "breadth"
+]
+FEATURE_SETS = {
+    "all": BASE_FEATURES,
+    "rf": [
+        "total_lines",
+        "speech_share_pct", "line_share_pct", "avg_speeches_per_scene", "avg_lines_per_speech",
+        "verbosity", "dominance", "focus", "breadth"
+    ],
+    "lg": ["scenes_appeared", "acts_appeared", "speech_share_pct", "line_share_pct", "dominance"],
+    "all+centrality": BASE_FEATURES + CENTRALITY_COLUMNS,
+    "all+dynamics": BASE_FEATURES + DYNAMICS_COLUMNS,
+    "all+stylometry": BASE_FEATURES + STYLOMETRY_COLUMNS,
+    "all+temporal": BASE_FEATURES + TEMPORAL_COLUMNS,
+}
+
+# model name -> (estimator, parameter grid); pipeline params use make_pipeline step names
+MODEL_SPACE = {
+    "random_forest": (
+        RandomForestClassifier(class_weight="balanced", n_jobs=1),
+        {
+            "n_estimators": [100, 300],
+            "max_depth": [None, 5, 10],
+            "min_samples_leaf": [1, 3],
+            "max_features": ["sqrt", 0.5],
+        },
+    ),
+    "logistic_regression": (
+        make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000, class_weight="balanced")),
+        {"logisticregression__C": [0.01, 0.1, 1.0, 10.0]},
+    ),
+}
+
+
+# -----------------------
+# Data + feature cache
+# -----------------------
+def load_training_frame(csv_dir="../csv") -> pd.DataFrame:
+    """
+    Character stats joined with archetype labels, centrality, dynamics,
+    stylometry and temporal network features, as in base_models.ipynb.
+    """
+    character_df = pd.read_csv(os.path.join(csv_dir, "all_plays_char_stats.csv"))
+    archetype_df = pd.read_csv(os.path.join(csv_dir, "all_char_archetypes.csv"))
+    character_df = add_centrality_features(character_df, csv_dir=csv_dir)
+    character_df = add_dynamics_features(character_df, csv_dir=csv_dir)
+    character_df = add_stylometry_features(character_df, csv_dir=csv_dir)
+    character_df = add_temporal_features(character_df, csv_dir=csv_dir)
+    return pd.merge(character_df, archetype_df, on=["character", "play"], how="inner")
+
+
+def _frame_digest(df, columns) -> str:
+    h = hashlib.sha1("\x1f".join(columns).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def _save_array(path, arr):
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp, arr)
+        os.replace(tmp, path)
+    return path
+
+
+def cache_feature_matrices(df, feature_sets=FEATURE_SETS, label_col="campbell_archetype", cache_dir=FEATURE_CACHE_DIR):
+    """
+    Write X (one per feature set, NaN -> 0) and the encoded labels to
+    cache_dir, skipping any that are already there. Returns
+    ({set name: X path}, y path, LabelEncoder).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    le = LabelEncoder().fit(df[label_col])
+    y_path = _save_array(
+        os.path.join(cache_dir, f"y_{_frame_digest(df, [label_col])}.npy"),
+        le.transform(df[label_col]).astype(np.int64)
+    )
+    x_paths = {}
+    for name, cols in feature_sets.items():
+        x_paths[name] = _save_array(
+            os.path.join(cache_dir, f"X_{_frame_digest(df, list(cols))}.npy"),
+            df[list(cols)].fillna(0).to_numpy(dtype=np.float64)
+        )
+    return x_paths, y_path, le
+
+
+@functools.lru_cache(maxsize=32)
+def _load_array(path):
+    """Memory-mapped cache file, opened once per process."""
+    return np.load(path, mmap_mode="r")
+
+
+# -----------------------
+# Search
+# -----------------------
+def _configs(feature_sets, models):
+    for feature_set in feature_sets:
+        for model_name, (_, grid) in models.items():
+            keys = sorted(grid)
+            for values in itertools.product(*(grid[k] for k in keys)):
+                yield feature_set, model_name, dict(zip(keys, values))
+
+
+def _fit_and_score(task):
+    """One fold of one configuration (runs inside pool workers)."""
+    x_path, y_path, estimator, scoring, n_splits, seed, repeat, fold = task
+    X, y = _load_array(x_path), _load_array(y_path)
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed + repeat)
+    train, test = list(splitter.split(np.zeros(len(y)), y))[fold]
+    model = clone(estimator).fit(X[train], y[train])
+    return get_scorer(scoring)(model, X[test], y[test])
+
+
+def model_search(
+    df=None,
+    feature_sets=FEATURE_SETS,
+    models=MODEL_SPACE,
+    n_splits=5,
+    n_repeats=4,
+    eta=3,
+    scoring="f1_macro",
+    workers=1,
+    seed=42,
+    cache_dir=FEATURE_CACHE_DIR,
+    csv_dir="../csv"
+) -> pd.DataFrame:
+    """
+    Successive-halving search over feature_sets x models (see module
+    docstring). Returns one row per configuration, best first:
+        feature_set, model, params, repeats, mean_score, std_score, rung
+    where `repeats` is how many CV repeats it survived to.
+    """
+    if df is None:
+        df = load_training_frame(csv_dir)
+    x_paths, y_path, _ = cache_feature_matrices(df, feature_sets, cache_dir=cache_dir)
+
+    configs = list(_configs(feature_sets, models))
+    scores = {i: [] for i in range(len(configs))}
+    reached = {i: 0 for i in range(len(configs))}
+    alive = list(range(len(configs)))
+    done, rung = 0, 0
+
+    while alive and done < n_repeats:
+        target = min(n_repeats, eta ** rung)
+        tasks, owners = [], []
+        for i in alive:
+            feature_set, model_name, params = configs[i]
+            estimator = clone(models[model_name][0]).set_params(**params)
+            if "random_state" in estimator.get_params():
+                estimator.set_params(random_state=seed)
+            for repeat in range(done, target):
+                for fold in range(n_splits):
+                    tasks.append((x_paths[feature_set], y_path, estimator, scoring, n_splits, seed, repeat, fold))
+                    owners.append(i)
+
+        for i, score in zip(owners, run_per_play(_fit_and_score, tasks, workers)):
+            scores[i].append(score)
+        for i in alive:
+            reached[i] = rung
+        print(f"Rung {rung}: {len(alive)} configurations x {target} repeats")
+
+        done = target
+        if done < n_repeats:
+            keep = max(1, math.ceil(len(alive) / eta))
+            alive = sorted(alive, key=lambda i: -np.mean(scores[i]))[:keep]
+        rung += 1
+
+    rows = []
+    for i, (feature_set, model_name, params) in enumerate(configs):
+        rows.append({
+            "feature_set": feature_set,
+            "model": model_name,
+            "params": params,
+            "repeats": len(scores[i]) // n_splits,
+            "mean_score": float(np.mean(scores[i])),
+            "std_score": float(np.std(scores[i])),
+            "rung": reached[i],
+        })
+    results = pd.DataFrame(rows)
+    return results.sort_values(["repeats", "mean_score"], ascending=False, ignore_index=True)
+
+
+def best_estimator(results, feature_sets=FEATURE_SETS, models=MODEL_SPACE, seed=42):
+    """Unfitted estimator for the top configuration of a model_search result; returns (estimator, feature columns)."""
+    best = results.iloc[0]
+    params = best["params"]
+    if isinstance(params, str):  # read back from model_search_results.csv
+        params = ast.literal_eval(params)
+    cols = list(feature_sets[best["feature_set"]])
+    estimator = clone(models[best["model"]][0]).set_params(**params)
+    if "random_state" in estimator.get_params():
+        estimator.set_params(random_state=seed)
+    return estimator, cols
+
+
+def fit_best(results, df=None, feature_sets=FEATURE_SETS, models=MODEL_SPACE, label_col="campbell_archetype", seed=42, csv_dir="../csv"):
+    """Refit the top configuration of a model_search result on all rows; returns (model, feature columns)."""
+    if df is None:
+        df = load_training_frame(csv_dir)
+    estimator, cols = best_estimator(results, feature_sets, models, seed)
+    return estimator.fit(df[cols].fillna(0), df[label_col]), cols
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-dir", default="../csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=4)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--scoring", default="f1_macro")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="../csv/model_search_results.csv")
+    args = parser.parse_args(argv)
+
+    results = model_search(
+        n_splits=args.splits,
+        n_repeats=args.repeats,
+        eta=args.eta,
+        scoring=args.scoring,
+        workers=args.workers,
+        seed=args.seed,
+        csv_dir=args.csv_dir,
+    )
+    results.to_csv(args.out, index=False)
+    print(results.head(10).to_string(index=False))
+    print(f"Saved model search results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Local HTTP/JSON query server over the csv/ outputs.
+
+Loads the corpus tables (character stats, story stats, per-scene line
+counts from the _lines.csv files), the centrality table and the saved
+archetype model once at startup, then answers queries from memory.
+Requests are served concurrently (one thread each); answers are kept in an
+LRU cache keyed by endpoint + parameters, and every endpoint's latency is
+recorded.
+Everything is read from disk: no network access beyond the local socket.
+
+    python query_server.py --port 8765
+
+    GET  /plays                                   plays with their totals
+    GET  /characters?play=...&role_type=main      character stats rows
+    GET  /character?name=CASSIUS[&play=...]       stats + centrality for a character
+    GET  /line_share?name=CASSIUS[&play=...][&by=act|scene]
+    GET  /centrality?play=...[&name=...]
+    GET  /predict?name=...[&play=...]             archetype of a character in the corpus
+    POST /predict  {"rows": [{feature: value, ...}, ...]}   archetype of new characters
+    GET  /metrics                                 per-endpoint latency and cache hits
+    GET  /health
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from eda_utils import normalize_name
+
+DEFAULT_PORT = 8765
+CACHE_SIZE = 1024
+LATENCY_WINDOW = 1000    # latencies kept per endpoint for the percentiles
+
+
+class QueryError(Exception):
+    """A request that cannot be answered; carries the HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _records(df) -> list:
+    """DataFrame rows as JSON-ready dicts (NaN -> null, numpy scalars -> Python)."""
+    return json.loads(df.to_json(orient="records"))
+
+
+# -----------------------
+# Result cache + metrics
+# -----------------------
+class LRUCache:
+    """Thread-safe least-recently-used cache of finished responses."""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class EndpointMetrics:
+    """Request counts, errors, cache hits and recent latencies per endpoint."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._latency = defaultdict(lambda: deque(maxlen=window))
+        self._counts = defaultdict(lambda: {"requests": 0, "errors": 0, "cache_hits": 0})
+
+    def record(self, endpoint, seconds, error=False, cache_hit=False):
+        with self._lock:
+            counts = self._counts[endpoint]
+            counts["requests"] += 1
+            counts["errors"] += int(error)
+            counts["cache_hits"] += int(cache_hit)
+            self._latency[endpoint].append(seconds * 1000)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for endpoint, counts in self._counts.items():
+                ms = np.asarray(self._latency[endpoint])
+                out[endpoint] = {
+                    **counts,
+                    "mean_ms": round(float(ms.mean()), 3),
+                    "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                    "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                    "max_ms": round(float(ms.max()), 3),
+                }
+            return out
+
+
+# -----------------------
+# Queries
+# -----------------------
+class QueryService:
+    """The in-memory tables and the query functions over them."""
+
+    def __init__(self, csv_dir="../csv", model_path=None, cache_size=CACHE_SIZE):
+        from centrality import add_centrality_features, centrality_table
+
+        self.csv_dir = csv_dir
+        self.characters = pd.read_csv(os.path.join(csv_dir, "all_plays_char_stats.csv"))
+        self.plays = pd.read_csv(os.path.join(csv_dir, "all_plays_story_stats.csv"))
+        self.centrality = centrality_table(csv_dir, out_path=None)
+        self.characters = add_centrality_features(self.characters, self.centrality)
+        self.characters["_key"] = self.characters["character"].map(normalize_name)
+
+        # one _lines.csv row per non-blank verse line; see line_share for how this
+        # differs from the char stats' total_lines
+        paths = sorted(glob.glob(os.path.join(csv_dir, "*_lines.csv")))
+        lines = pd.concat(
+            [pd.read_csv(p, usecols=["Play", "Act", "Scene", "Character"]) for p in paths],
+            ignore_index=True,
+        )
+        self.scene_lines = (
+            lines.groupby(["Play", "Act", "Scene", "Character"]).size().reset_index(name="lines")
+            .rename(columns={"Play": "play", "Act": "act", "Scene": "scene", "Character": "character"})
+        )
+        self.scene_lines["_key"] = self.scene_lines["character"].map(normalize_name)
+
+        self.model = self._load_model(model_path)
+        self.cache = LRUCache(cache_size)
+        self.metrics = EndpointMetrics()
+        self.endpoints = {
+            "/health": self.health,
+            "/plays": self.list_plays,
+            "/characters": self.list_characters,
+            "/character": self.character,
+            "/line_share": self.line_share,
+            "/centrality": self.play_centrality,
+            "/predict": self.predict,
+            "/metrics": self.metrics_report,
+        }
+
+    def _load_model(self, model_path):
+        from archetype_model import MODEL_PATH, load_model
+
+        path = model_path or MODEL_PATH
+        if not os.path.exists(path):
+            return None
+        model = load_model(path)
+        # corpus characters get every feature column the model was trained on
+        if model.needs_dynamics:
+            from dynamics import add_dynamics_features
+            self.characters = add_dynamics_features(self.characters, csv_dir=self.csv_dir)
+        if model.needs_stylometry:
+            from stylometry import add_stylometry_features
+            self.characters = add_stylometry_features(self.characters, csv_dir=self.csv_dir)
+        if model.needs_temporal:
+            from temporal_networks import add_temporal_features
+            self.characters = add_temporal_features(self.characters, csv_dir=self.csv_dir)
+        return model
+
+    # --- helpers ---
+    def _match(self, df, name=None, play=None):
+        if play is not None:
+            df = df[df["play"] == play]
+            if df.empty:
+                raise QueryError(f"Unknown play: {play}", 404)
+        if name is not None:
+            df = df[df["_key"] == normalize_name(name)]
+            if df.empty:
+                raise QueryError(f"Unknown character: {name}" + (f" ({play})" if play else ""), 404)
+        return df
+
+    @staticmethod
+    def _param(params, name, required=False):
+        value = params.get(name)
+        if required and not value:
+            raise QueryError(f"Missing parameter: {name}")
+        return value
+
+    # --- endpoints (params -> JSON-ready result) ---
+    def health(self, params):
+        return {"status": "ok", "plays": int(self.characters["play"].nunique()), "model": self.model is not None}
+
+    def list_plays(self, params):
+        return _records(self.plays)
+
+    def list_characters(self, params):
+        df = self._match(self.characters, play=self._param(params, "play"))
+        role_type = self._param(params, "role_type")
+        if role_type:
+            df = df[df["role_type"] == role_type]
+        return _records(df.drop(columns="_key"))
+
+    def character(self, params):
+        df = self._match(self.characters, self._param(params, "name", True), self._param(params, "play"))
+        return _records(df.drop(columns="_key"))
+
+    def line_share(self, params):
+        """
+        Lines and share (%) of all dialogue per act (or per scene) for a
+        character, counted as _lines.csv rows. The char stats' total_lines
+        (/character) comes from summarize_play_stats, which also counts blank
+        LINE elements and speeches with no text, so it can be a few lines
+        higher.
+        """
+        by = self._param(params, "by") or "act"
+        if by not in ("act", "scene"):
+            raise QueryError("by must be 'act' or 'scene'")
+        keys = ["play", "act"] if by == "act" else ["play", "act", "scene"]
+        lines = self._match(self.scene_lines, play=self._param(params, "play"))
+        mine = self._match(lines, self._param(params, "name", True))
+        totals = lines.groupby(keys)["lines"].sum().rename("total_lines")
+        out = mine.groupby(keys + ["character"])["lines"].sum().reset_index().join(totals, on=keys)
+        out["line_share_pct"] = (out["lines"] / out["total_lines"] * 100).round(2)
+        return _records(out)
+
+    def play_centrality(self, params):
+        df = self.centrality.assign(_key=self.centrality["character"].map(normalize_name))
+        df = self._match(df, self._param(params, "name"), self._param(params, "play", True))
+        return _records(df.drop(columns="_key"))
+
+    def predict(self, params, body=None):
+        if self.model is None:
+            raise QueryError("No trained archetype model; run `python archetype_model.py train` first", 503)
+        if body is not None:
+            rows = body.get("rows") if isinstance(body, dict) else None
+            if not rows:
+                raise QueryError('POST /predict expects {"rows": [{feature: value, ...}, ...]}')
+            df = pd.DataFrame(rows)
+            missing = [c for c in self.model.feature_cols if c not in df.columns]
+            if missing:
+                raise QueryError(f"Missing features: {', '.join(missing)}")
+            features = df[self.model.feature_cols].apply(pd.to_numeric, errors="coerce")
+            bad = [c for c in self.model.feature_cols if (features[c].isna() & df[c].notna()).any()]
+            if bad:
+                raise QueryError(f"Non-numeric feature values: {', '.join(bad)}")
+            df[self.model.feature_cols] = features
+        else:
+            df = self._match(self.characters, self._param(params, "name", True), self._param(params, "play"))
+        preds = self.model.predict(df, proba=True)
+        return _records(preds)
+
+    def metrics_report(self, params):
+        return {"endpoints": self.metrics.snapshot(), "cache_entries": len(self.cache)}
+
+    # --- dispatch ---
+    def handle(self, path, params, body=None):
+        """(status, JSON bytes) for a request; cached unless it is a POST or a live endpoint."""
+        start = time.perf_counter()
+        key = (path, tuple(sorted(params.items())))
+        cacheable = body is None and path not in ("/metrics", "/health")
+        payload = self.cache.get(key) if cacheable else None
+        hit = payload is not None
+        status = 200
+        if not hit:
+            try:
+                endpoint = self.endpoints.get(path)
+                if endpoint is None:
+                    raise QueryError(f"Unknown endpoint: {path}", 404)
+                if body is not None and path != "/predict":
+                    raise QueryError(f"{path} does not accept POST", 405)
+                result = endpoint(params, body) if path == "/predict" else endpoint(params)
+                payload = json.dumps(result).encode("utf-8")
+                if cacheable:
+                    self.cache.put(key, payload)
+            except QueryError as exc:
+                status, payload = exc.status, json.dumps({"error": str(exc)}).encode("utf-8")
+            except Exception as exc:
+                # answer and count it rather than letting the request thread die without a reply
+                status = 500
+                payload = json.dumps({"error": f"{type(exc).__name__}: {exc}"}).encode("utf-8")
+        name = path if path in self.endpoints else "(unknown)"
+        self.metrics.record(name, time.perf_counter() - start, error=status != 200, cache_hit=hit)
+        return status, payload
+
+
+# -----------------------
+# HTTP
+# -----------------------
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status, payload):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            self._reply(*service.handle(url.path, params))
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._reply(400, b'{"error": "Request body is not valid JSON"}')
+                return
+            self._reply(*service.handle(url.path, {}, body))
+
+        def log_message(self, format, *args):
+            pass  # latency and errors are in /metrics
+
+    return Handler
+
+
+def serve(csv_dir="../csv", host="127.0.0.1", port=DEFAULT_PORT, model_path=None, cache_size=CACHE_SIZE):
+    service = QueryService(csv_dir, model_path=model_path, cache_size=cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Serving {service.characters['play'].nunique()} plays on http://{host}:{server.server_port}"
+          f" (model: {'loaded' if service.model else 'none'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-dir", default="../csv")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model", help="archetype model pickle (default: archetype_model.MODEL_PATH)")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="responses kept in the LRU cache")
+    args = parser.parse_args(argv)
+    serve(args.csv_dir, args.host, args.port, args.model, args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+Figure-rendering stage for the per-play PNGs in figures/.
+
+The two per-play plots of eda.ipynb live here:
+
+    plot_play_network_centrality   <play>_network_centrality.png (from _network.csv)
+    plot_scene_dominance           <play>_scene_dominance.png    (from _speeches.csv)
+
+Both draw on a matplotlib Figure with an Agg canvas rather than through
+pyplot, so they run headless in run_per_play's worker processes and never
+touch the notebook's inline backend.
+
+render_figures() renders every play's figures in parallel and keeps a
+manifest of the inputs each PNG was drawn from (the source CSV's contents,
+the plot parameters and the code that draws it: this module, centrality.py,
+eda_utils and the matplotlib / networkx versions). A figure whose inputs have
+not changed is skipped, so after a data fix only the affected plays are
+redrawn. Spring / Kamada-Kawai layouts are also cached per play in
+../.play_cache/layouts, keyed by the network's edge hash, so restyling a
+network figure does not recompute its node positions.
+
+    python render_figures.py --workers 8
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import Normalize
+from matplotlib.cm import ScalarMappable
+from matplotlib.figure import Figure
+
+import centrality
+from eda_utils import PLAY_CACHE_DIR, code_version_hash, run_per_play
+
+FIGURE_DIR = "./figures"
+LAYOUT_CACHE_DIR = os.path.join(PLAY_CACHE_DIR, "layouts")
+FIGURE_MANIFEST_PATH = os.path.join(PLAY_CACHE_DIR, "figure_manifest.json")
+
+# parameters the notebook renders figures/ with
+NETWORK_DEFAULTS = {"label_top_n": 15, "layout": "spring", "seed": 42, "max_nodes": 15}
+DOMINANCE_DEFAULTS = {"top_n": 4, "normalize": False}
+
+
+def _new_figure(**kwargs):
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _file_hash(path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _code_hash() -> str:
+    """
+    Hash of everything a figure depends on besides its input CSV: this
+    module, centrality.py, the eda_utils sources, and the matplotlib and
+    networkx versions that draw and lay out the plots.
+    """
+    import matplotlib
+    import networkx
+    h = hashlib.sha1()
+    for path in (os.path.abspath(__file__), os.path.abspath(centrality.__file__)):
+        h.update(_file_hash(path).encode())
+    h.update(code_version_hash().encode())
+    h.update(f"{matplotlib.__version__}/{networkx.__version__}".encode())
+    return h.hexdigest()[:12]
+
+
+# -----------------------
+# Cached layouts
+# -----------------------
+def network_layout(G, edges_key, layout="spring", seed=42, cache_dir=LAYOUT_CACHE_DIR) -> dict:
+    """
+    Node positions for G, cached under the play's edge hash plus the layout
+    settings. edges_key must change whenever G's nodes or edges do.
+    """
+    import networkx as nx
+
+    key = hashlib.sha1(repr((edges_key, sorted(G.nodes()), layout, seed)).encode("utf-8")).hexdigest()
+    path = os.path.join(cache_dir, f"{key}.pkl") if cache_dir else None
+    if path and os.path.exists(path):
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+
+    if layout == "kamada":
+        pos = nx.kamada_kawai_layout(G)
+    elif layout == "spectral":
+        pos = nx.spectral_layout(G)
+    else:  # spring
+        # Increased k for more spacing, more iterations for better convergence
+        pos = nx.spring_layout(G, k=4.0, iterations=1000, seed=seed)
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(pos, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    return pos
+
+
+# -----------------------
+# Figures
+# -----------------------
+def plot_play_network_centrality(
+    play_name: str,
+    csv_dir: str = "../csv",
+    out_dir: str = FIGURE_DIR,
+    label_top_n: int = 12,
+    layout: str = "spring",
+    seed: int = 42,
+    max_nodes: int = 30,
+    layout_cache_dir: str = LAYOUT_CACHE_DIR,
+) -> list:
+    """
+    Network visualization with betweenness centrality.
+    - Node size & color ~ betweenness centrality
+    - Edge width ~ scenes shared
+    - Labels: top-N by centrality
+    - Only the max_nodes most central characters, to reduce overlap
+    Returns the log lines.
+    """
+    import networkx as nx
+
+    os.makedirs(out_dir, exist_ok=True)
+    net_path = os.path.join(csv_dir, f"{play_name}_network.csv")
+    if not os.path.exists(net_path):
+        return [f"Missing file: {net_path}"]
+
+    # --- Build graph straight from the edge arrays ---
+    _, names, src, dst, weight = centrality.load_edges(net_path)
+    G = nx.Graph()
+    G.add_weighted_edges_from((names[a], names[b], w) for a, b, w in zip(src, dst, weight.tolist()))
+    if G.number_of_nodes() == 0:
+        return [f"No nodes for {play_name}. Skipping."]
+
+    log = []
+    # --- Betweenness on full graph (cached per play in ../.play_cache/centrality) ---
+    cent_df = centrality.play_centrality(play_name, csv_dir=csv_dir)
+    centrality_scores = dict(zip(cent_df["character"], cent_df["betweenness"]))
+
+    # --- Filter to top N characters by centrality to reduce overlap ---
+    if G.number_of_nodes() > max_nodes:
+        top_chars = sorted(centrality_scores, key=centrality_scores.get, reverse=True)[:max_nodes]
+        G = G.subgraph(top_chars).copy()
+        log.append(f"Filtered to top {max_nodes} characters by centrality")
+
+    pos = network_layout(
+        G, centrality.edges_hash(names, src, dst, weight), layout=layout, seed=seed, cache_dir=layout_cache_dir
+    )
+
+    # --- Metrics (for the filtered graph) ---
+    centrality_filtered = {n: centrality_scores[n] for n in G.nodes()}
+    max_cent = max(centrality_filtered.values())
+    min_cent = min(centrality_filtered.values())
+    cent_range = max_cent - min_cent if max_cent > min_cent else 1
+    node_sizes = [300 + 3000 * ((centrality_filtered[n] - min_cent) / cent_range) ** 0.7 for n in G.nodes()]
+    node_colors = [centrality_filtered[n] for n in G.nodes()]
+
+    edge_weights = [d["weight"] for _, _, d in G.edges(data=True)]
+    max_weight = max(edge_weights)
+    min_weight = min(edge_weights)
+    weight_range = max_weight - min_weight if max_weight > min_weight else 1
+    edge_widths = [0.3 + 2.5 * ((w - min_weight) / weight_range) for w in edge_weights]
+
+    # --- Plot ---
+    fig = _new_figure(figsize=(14, 10), facecolor="white")
+    ax = fig.add_subplot()
+    ax.set_facecolor("#fafafa")
+    title = play_name.replace("_", " ").title()
+    ax.set_title(title, fontsize=20, pad=20, fontweight="bold", family="serif")
+
+    # Edges with transparency based on weight
+    edge_alphas = [0.1 + 0.4 * ((w - min_weight) / weight_range) for w in edge_weights]
+    for (u, v, d), width, alpha in zip(G.edges(data=True), edge_widths, edge_alphas):
+        nx.draw_networkx_edges(G, pos, edgelist=[(u, v)], width=width, alpha=alpha, edge_color="#404040", ax=ax)
+
+    viridis = colormaps["viridis"]
+    nx.draw_networkx_nodes(
+        G, pos,
+        node_size=node_sizes,
+        node_color=node_colors,
+        cmap=viridis,
+        edgecolors="white",
+        linewidths=2.5,
+        alpha=0.95,
+        ax=ax,
+    )
+
+    # --- Labels for top-N by centrality ---
+    top_nodes = sorted(centrality_filtered, key=centrality_filtered.get, reverse=True)[:label_top_n]
+    labels = set(top_nodes)
+    for node, (x, y) in pos.items():
+        if node in labels:
+            font_size = 9 + 4 * (centrality_filtered[node] / max_cent)
+            font_weight = "bold" if centrality_filtered[node] > max_cent * 0.5 else "semibold"
+            ax.text(
+                x, y, node,
+                fontsize=font_size,
+                fontweight=font_weight,
+                ha="center",
+                va="center",
+                bbox=dict(facecolor="white", edgecolor="none", alpha=0.85, boxstyle="round,pad=0.4"),
+                zorder=1000,
+            )
+
+    # --- Colorbar ---
+    sm = ScalarMappable(cmap=viridis, norm=Normalize(vmin=min(node_colors), vmax=max(node_colors)))
+    sm.set_array([])
+    cbar = fig.colorbar(sm, ax=ax, shrink=0.6, aspect=20, pad=0.02)
+    cbar.set_label("Betweenness Centrality", fontsize=12, fontweight="semibold")
+    cbar.ax.tick_params(labelsize=10)
+
+    ax.grid(True, alpha=0.1, linestyle="--", linewidth=0.5)
+    ax.axis("off")
+    fig.tight_layout()
+
+    out_path = os.path.join(out_dir, f"{play_name}_network_centrality.png")
+    fig.savefig(out_path, dpi=300, bbox_inches="tight", facecolor="white")
+    log.append(f"Saved: {out_path}")
+
+    log.append(f"\nTop {label_top_n} characters by betweenness centrality:")
+    for i, node in enumerate(top_nodes, 1):
+        log.append(f"  {i}. {node}: {centrality_filtered[node]:.4f}")
+    return log
+
+
+def plot_scene_dominance(
+    speeches_path: str,
+    out_dir: str = FIGURE_DIR,
+    top_n: int = 6,
+    normalize: bool = False,
+) -> list:
+    """
+    Scene-level dominance plot (dialogue lines per scene of the top_n
+    talkers) for one <play>_speeches.csv. Returns the log lines.
+    """
+    import seaborn as sns
+
+    os.makedirs(out_dir, exist_ok=True)
+    df = pd.read_csv(speeches_path, usecols=["Act", "Scene", "Character", "Line Count"])
+    if df.empty:
+        return []
+
+    # --- Aggregate total lines per scene/character
+    scene_summary = (
+        df.groupby(["Act", "Scene", "Character"], as_index=False)["Line Count"]
+          .sum()
+          .rename(columns={"Line Count": "Total Lines"})
+    )
+
+    # Pick top N talkers
+    total_lines = scene_summary.groupby("Character")["Total Lines"].sum().sort_values(ascending=False)
+    top_chars = total_lines.head(top_n).index
+    plot_df = scene_summary[scene_summary["Character"].isin(top_chars)].copy()
+
+    if normalize:
+        scene_totals = plot_df.groupby(["Act", "Scene"])["Total Lines"].transform("sum")
+        plot_df["Line Share (%)"] = plot_df["Total Lines"] / scene_totals * 100
+        y_col = "Line Share (%)"
+        y_label = "Share of Scene Dialogue (%)"
+    else:
+        y_col = "Total Lines"
+        y_label = "Dialogue Lines"
+
+    # Combine Act.Scene for x-axis
+    plot_df["Scene ID"] = plot_df["Act"].astype(str) + "." + plot_df["Scene"].astype(str)
+
+    # --- Plot ---
+    fig = _new_figure(figsize=(12, 6))
+    ax = fig.add_subplot()
+    sns.lineplot(data=plot_df, x="Scene ID", y=y_col, hue="Character", marker="o", linewidth=2, alpha=0.9, ax=ax)
+
+    f = os.path.basename(speeches_path)
+    title = f.replace("_speeches.csv", "").replace("_", " ").title()
+    ax.set_title(f"{title} — Character Dialogue Over Scenes", fontsize=14, pad=12)
+    ax.set_xlabel("Scene (Act.Scene)")
+    ax.set_ylabel(y_label)
+    ax.tick_params(axis="x", labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    ax.grid(True, alpha=0.3)
+    ax.legend(title="Character", bbox_to_anchor=(1.05, 1), loc="upper left")
+    fig.tight_layout()
+
+    out_path = os.path.join(out_dir, f.replace("_speeches.csv", "_scene_dominance.png"))
+    fig.savefig(out_path, dpi=300, bbox_inches="tight")
+    return [f"Saved {out_path}"]
+
+
+# -----------------------
+# Rendering stage
+# -----------------------
+def _figure_jobs(csv_dir, out_dir, kinds, network_kw, dominance_kw):
+    """(kind, source csv, output png, kwargs) for every figure of every play."""
+    jobs = []
+    if "network" in kinds:
+        for path in sorted(glob.glob(os.path.join(csv_dir, "*_network.csv"))):
+            stem = os.path.basename(path)[: -len("_network.csv")]
+            kw = {"play_name": stem, "csv_dir": csv_dir, "out_dir": out_dir, **network_kw}
+            jobs.append(("network", path, os.path.join(out_dir, f"{stem}_network_centrality.png"), kw))
+    if "dominance" in kinds:
+        for path in sorted(glob.glob(os.path.join(csv_dir, "*_speeches.csv"))):
+            stem = os.path.basename(path)[: -len("_speeches.csv")]
+            kw = {"speeches_path": path, "out_dir": out_dir, **dominance_kw}
+            jobs.append(("dominance", path, os.path.join(out_dir, f"{stem}_scene_dominance.png"), kw))
+    return jobs
+
+
+def _figure_key(kind, source, kw, code) -> str:
+    params = {k: v for k, v in kw.items() if k not in ("csv_dir", "out_dir", "speeches_path", "layout_cache_dir")}
+    return hashlib.sha1(repr((kind, _file_hash(source), sorted(params.items()), code)).encode("utf-8")).hexdigest()
+
+
+def _render_job(job):
+    kind, _, _, kw = job
+    plot = plot_play_network_centrality if kind == "network" else plot_scene_dominance
+    return plot(**kw)
+
+
+def render_figures(
+    csv_dir="../csv",
+    out_dir=FIGURE_DIR,
+    kinds=("network", "dominance"),
+    network_kw=None,
+    dominance_kw=None,
+    workers=1,
+    manifest_path=FIGURE_MANIFEST_PATH,
+    force=False,
+) -> list:
+    """
+    Render every play's figures into out_dir, skipping those whose inputs
+    are unchanged since the last run (force=True redraws everything).
+    network_kw / dominance_kw override NETWORK_DEFAULTS / DOMINANCE_DEFAULTS.
+    Returns the paths of the figures drawn.
+    """
+    network_kw = {**NETWORK_DEFAULTS, **(network_kw or {})}
+    dominance_kw = {**DOMINANCE_DEFAULTS, **(dominance_kw or {})}
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+
+    code = _code_hash()
+    jobs, keys = [], {}
+    for job in _figure_jobs(csv_dir, out_dir, kinds, network_kw, dominance_kw):
+        kind, source, out_path, kw = job
+        keys[out_path] = _figure_key(kind, source, kw, code)
+        if force or manifest.get(out_path) != keys[out_path] or not os.path.exists(out_path):
+            jobs.append(job)
+
+    for log in run_per_play(_render_job, jobs, workers):
+        print("\n".join(log))
+
+    for _, _, out_path, _ in jobs:
+        if os.path.exists(out_path):
+            manifest[out_path] = keys[out_path]
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp = f"{manifest_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    os.replace(tmp, manifest_path)
+
+    print(f"Figures: {len(jobs)} rendered, {len(keys) - len(jobs)} up to date")
+    return [out_path for _, _, out_path, _ in jobs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-dir", default="../csv")
+    parser.add_argument("--out-dir", default=FIGURE_DIR)
+    parser.add_argument("--kind", choices=["network", "dominance"], action="append", help="only these figures (repeatable)")
+    parser.add_argument("--workers", type=int, default=1, help="process-pool size (0 = one per CPU)")
+    parser.add_argument("--force", action="store_true", help="redraw figures even when their inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    render_figures(
+        args.csv_dir,
+        args.out_dir,
+        kinds=tuple(args.kind or ("network", "dominance")),
+        workers=args.workers or None,
+        force=args.force,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Batched, cached VADER sentiment features for characters.
+
+Every distinct line of dialogue is scored once, with a single
+polarity_scores call, and the scores are kept in an SQLite cache keyed
+by a hash of the text. Later runs, or other plays that share a line,
+skip the scoring entirely. Scores that are still missing are computed in
+batches across a process pool.
+
+The scores are then turned into per-character columns (mean and variance
+of the compound score, mean pos/neg/neu, and the mean compound score per
+act) and joined onto all_plays_char_stats.csv.
+"""
+import glob
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from eda_utils import PLAY_CACHE_DIR, run_per_play
+
+SENTIMENT_CACHE_PATH = os.path.join(PLAY_CACHE_DIR, "sentiment.sqlite")
+SCORE_COLUMNS = ["compound", "pos", "neg", "neu"]
+BATCH_SIZE = 2000
+
+_analyzer = None
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _score_batch(texts):
+    """VADER scores for a batch of texts (runs inside pool workers)."""
+    global _analyzer
+    if _analyzer is None:
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    rows = []
+    for text in texts:
+        scores = _analyzer.polarity_scores(text)
+        rows.append(tuple(scores[c] for c in SCORE_COLUMNS))
+    return rows
+
+
+def _open_cache(cache_path):
+    if os.path.dirname(cache_path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    conn = sqlite3.connect(cache_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS scores "
+        "(hash TEXT PRIMARY KEY, compound REAL, pos REAL, neg REAL, neu REAL)"
+    )
+    return conn
+
+
+def score_texts(texts, cache_path=SENTIMENT_CACHE_PATH, workers=1) -> pd.DataFrame:
+    """
+    VADER compound/pos/neg/neu scores for `texts`, one row per input in the
+    same order. Each distinct text is scored at most once, ever.
+    """
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str)
+    codes, uniques = pd.factorize(texts)
+    hashes = [_text_hash(t) for t in uniques]
+
+    conn = _open_cache(cache_path)
+    try:
+        cached = {}
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            query = f"SELECT * FROM scores WHERE hash IN ({','.join('?' * len(chunk))})"
+            for h, *scores in conn.execute(query, chunk):
+                cached[h] = scores
+
+        missing = [i for i, h in enumerate(hashes) if h not in cached]
+        batches = [missing[i:i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
+        results = run_per_play(_score_batch, [[uniques[i] for i in b] for b in batches], workers)
+
+        new_rows = []
+        for batch, scores in zip(batches, results):
+            for i, row in zip(batch, scores):
+                cached[hashes[i]] = row
+                new_rows.append((hashes[i], *row))
+        if new_rows:
+            conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)", new_rows)
+            conn.commit()
+    finally:
+        conn.close()
+
+    table = np.array([cached[h] for h in hashes], dtype=float).reshape(-1, len(SCORE_COLUMNS))
+    return pd.DataFrame(table[codes], columns=SCORE_COLUMNS, index=texts.index)
+
+
+def load_lines(csv_dir="../csv") -> pd.DataFrame:
+    """Every play's _lines.csv stacked into one table."""
+    paths = sorted(glob.glob(os.path.join(csv_dir, "*_lines.csv")))
+    return pd.concat([pd.read_csv(p) for p in paths], ignore_index=True)
+
+
+def character_sentiment(lines_df, cache_path=SENTIMENT_CACHE_PATH, workers=1) -> pd.DataFrame:
+    """
+    Per-character sentiment features from line-level rows (the _lines.csv
+    layout). One row per (play, character) with:
+        sent_mean, sent_var              compound score mean / population variance
+        sent_pos, sent_neg, sent_neu     mean VADER proportions
+        sent_act_<n>                     mean compound score in act n
+        sent_trend                       slope of the per-act means across acts
+    """
+    scores = score_texts(lines_df["Text"], cache_path=cache_path, workers=workers)
+    df = pd.concat([lines_df[["Play", "Act", "Character"]], scores], axis=1)
+    df = df.rename(columns={"Play": "play", "Character": "character"})
+    keys = ["play", "character"]
+
+    grouped = df.groupby(keys)
+    features = pd.DataFrame({
+        "sent_mean": grouped["compound"].mean(),
+        "sent_var": grouped["compound"].var(ddof=0),
+        "sent_pos": grouped["pos"].mean(),
+        "sent_neg": grouped["neg"].mean(),
+        "sent_neu": grouped["neu"].mean(),
+    })
+
+    per_act = df.pivot_table(index=keys, columns="Act", values="compound", aggfunc="mean")
+    per_act.columns = [f"sent_act_{int(a)}" for a in per_act.columns]
+    features = features.join(per_act)
+
+    # least-squares slope over the acts each character actually speaks in
+    acts = np.array([int(c.rsplit("_", 1)[1]) for c in per_act.columns], dtype=float)
+    values = per_act.to_numpy()
+    present = ~np.isnan(values)
+    n = present.sum(axis=1)
+    x = np.where(present, acts, 0.0)
+    y = np.where(present, values, 0.0)
+    sx, sy = x.sum(axis=1), y.sum(axis=1)
+    sxx, sxy = (x * x).sum(axis=1), (x * y).sum(axis=1)
+    denom = n * sxx - sx ** 2
+    trend = np.zeros(len(per_act))
+    np.divide(n * sxy - sx * sy, denom, out=trend, where=denom > 0)
+    features["sent_trend"] = pd.Series(trend, index=per_act.index)
+
+    return features.reset_index()
+
+
+def add_sentiment_features(
+    csv_dir="../csv",
+    char_stats_file="all_plays_char_stats.csv",
+    out_file="all_plays_char_stats_with_sentiment.csv",
+    cache_path=SENTIMENT_CACHE_PATH,
+    workers=1
+) -> pd.DataFrame:
+    """
+    Join character sentiment features onto all_plays_char_stats.csv and save
+    the result next to it (characters without dialogue get NaN).
+    """
+    char_stats = pd.read_csv(os.path.join(csv_dir, char_stats_file))
+    features = character_sentiment(load_lines(csv_dir), cache_path=cache_path, workers=workers)
+    out = char_stats.merge(features, on=["play", "character"], how="left")
+
+    out_path = os.path.join(csv_dir, out_file)
+    out.to_csv(out_path, index=False)
+    print(f"Saved character sentiment features: {out_path}")
+    return out
@@ -0,0 +1,177 @@
+"""
+"Similar characters" index over character feature vectors.
+
+The features of cluster_main_characters_umap_kmeans (log-scaled line
+counts and dominance, verbosity, breadth, focus) are standardized once and
+indexed with pynndescent's approximate nearest-neighbour graph. Optionally
+the index is built over a UMAP embedding of those vectors instead.
+
+The scaler (and UMAP model) are fitted when the index is built and only
+applied afterwards, so add_play() inserts new characters into the existing
+graph without refitting anything. The index is pickled to
+SIMILARITY_INDEX_PATH.
+
+    index = SimilarityIndex.build(pd.read_csv("../csv/all_plays_char_stats.csv"))
+    index.save()
+    SimilarityIndex.load().similar("HAMLET", k=10)
+"""
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from pynndescent import NNDescent
+from sklearn.preprocessing import StandardScaler
+
+from eda_utils import PLAY_CACHE_DIR
+
+SIMILARITY_INDEX_PATH = os.path.join(PLAY_CACHE_DIR, "similarity", "index.pkl")
+
+# same reduced feature set as the UMAP + KMeans clustering in eda.ipynb
+SIMILARITY_FEATURES = ["total_lines", "dominance", "verbosity", "breadth", "focus"]
+LOG_FEATURES = ["total_lines", "dominance"]
+
+
+class SimilarityIndex:
+    """
+    Approximate k-NN index over (play, character) rows.
+
+    keys:    DataFrame of play / character in index row order
+    vectors: the indexed points (scaled features, or their UMAP embedding)
+    """
+
+    def __init__(self, scaler, reducer, keys, vectors, nn_index, features=SIMILARITY_FEATURES):
+        self.scaler = scaler
+        self.reducer = reducer
+        self.keys = keys
+        self.vectors = vectors
+        self.nn_index = nn_index
+        self.features = list(features)
+        self._rows = None
+
+    # -----------------------
+    # Building
+    # -----------------------
+    def _raw_features(self, characters_df) -> np.ndarray:
+        X = characters_df[self.features].fillna(0).to_numpy(dtype=np.float64)
+        for i, col in enumerate(self.features):
+            if col in LOG_FEATURES:
+                X[:, i] = np.log1p(X[:, i])
+        return X
+
+    def transform(self, characters_df) -> np.ndarray:
+        """Index-space vectors for a character table, using the fitted scaler / UMAP."""
+        X = self.scaler.transform(self._raw_features(characters_df))
+        if self.reducer is not None:
+            X = self.reducer.transform(X)
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    @classmethod
+    def build(cls, characters_df, features=SIMILARITY_FEATURES, umap_components=None,
+              n_neighbors=15, random_state=42):
+        """
+        Fit the scaler (and, with umap_components, a UMAP reducer) on
+        characters_df and index every row.
+        """
+        keys = characters_df[["play", "character"]].reset_index(drop=True)
+        index = cls(StandardScaler(), None, keys, None, None, features)
+        X = index.scaler.fit_transform(index._raw_features(characters_df))
+        if umap_components:
+            import umap  # heavy import, only needed for embedded indexes
+            index.reducer = umap.UMAP(n_components=umap_components, random_state=random_state)
+            X = index.reducer.fit_transform(X)
+        index.vectors = np.ascontiguousarray(X, dtype=np.float32)
+        index.nn_index = NNDescent(
+            index.vectors,
+            n_neighbors=min(n_neighbors, len(keys) - 1),
+            random_state=random_state,
+        )
+        index.nn_index.prepare()
+        return index
+
+    def add_play(self, characters_df):
+        """
+        Insert new characters (e.g. a newly parsed play) into the graph.
+        Plays already in the index are rejected; rebuild to replace one.
+        """
+        plays = set(characters_df["play"])
+        if plays & set(self.keys["play"]):
+            raise ValueError(f"Plays already indexed: {', '.join(sorted(plays & set(self.keys['play'])))}")
+        fresh = self.transform(characters_df)
+        self.nn_index.update(xs_fresh=fresh)
+        self.nn_index.prepare()
+        self.vectors = np.vstack([self.vectors, fresh])
+        self.keys = pd.concat([self.keys, characters_df[["play", "character"]]], ignore_index=True)
+        self._rows = None
+        return self
+
+    # -----------------------
+    # Queries
+    # -----------------------
+    @property
+    def rows(self):
+        """(play, character) -> index row, and character -> rows across plays."""
+        if self._rows is None:
+            by_key, by_name = {}, {}
+            for i, (play, character) in enumerate(zip(self.keys["play"], self.keys["character"])):
+                by_key[(play, character)] = i
+                by_name.setdefault(character, []).append(i)
+            self._rows = (by_key, by_name)
+        return self._rows
+
+    def _row(self, character, play=None):
+        by_key, by_name = self.rows
+        if play is not None:
+            if (play, character) not in by_key:
+                raise KeyError(f"{character} ({play}) is not in the index")
+            return by_key[(play, character)]
+        matches = by_name.get(character, [])
+        if len(matches) != 1:
+            where = "is not in the index" if not matches else "appears in several plays; pass play="
+            raise KeyError(f"{character} {where}")
+        return matches[0]
+
+    def _neighbours(self, vectors, k, exclude=None) -> pd.DataFrame:
+        extra = 0 if exclude is None else 1
+        idx, dist = self.nn_index.query(vectors, k=min(k + extra, len(self.keys)))
+        rows = []
+        for q, (ids, ds) in enumerate(zip(idx, dist)):
+            keep = [(i, d) for i, d in zip(ids, ds) if i != exclude][:k]
+            for rank, (i, d) in enumerate(keep, 1):
+                rows.append((q, rank, self.keys["play"].iat[i], self.keys["character"].iat[i], float(d)))
+        return pd.DataFrame(rows, columns=["query", "rank", "play", "character", "distance"])
+
+    def similar(self, character, play=None, k=10, same_play=True) -> pd.DataFrame:
+        """
+        The k characters closest to `character` (from `play` when the name
+        occurs in more than one), nearest first. same_play=False keeps only
+        characters from other plays.
+        """
+        row = self._row(character, play)
+        fetch = k if same_play else k + int((self.keys["play"] == self.keys["play"].iat[row]).sum())
+        out = self._neighbours(self.vectors[row:row + 1], fetch, exclude=row)
+        if not same_play:
+            out = out[out["play"] != self.keys["play"].iat[row]].head(k)
+            out["rank"] = np.arange(1, len(out) + 1)
+        return out.drop(columns="query").reset_index(drop=True)
+
+    def similar_to(self, characters_df, k=10) -> pd.DataFrame:
+        """Neighbours of characters that are not in the index; `query` is the input row number."""
+        return self._neighbours(self.transform(characters_df), k)
+
+    # -----------------------
+    # Persistence
+    # -----------------------
+    def save(self, path=SIMILARITY_INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._rows = None
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path=SIMILARITY_INDEX_PATH):
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
@@ -0,0 +1,212 @@
+"""
+Compact, memory-mappable storage for the speeches/lines tables.
+
+The per-play _speeches.csv / _lines.csv files repeat the play title and
+character name on every row, store each shared speech once per speaker and
+each line once per co-speaker. A SpeechStore keeps instead:
+
+- integer codes for play, act, scene and character (names live once in meta.json)
+- one UTF-8 text arena holding every spoken line exactly once; lines of a
+  speech sit next to each other separated by a single space, so a speech's
+  text is just the span from its first line to its last
+- a (speech, character) table for who speaks each speech
+
+Every array is a .npy file opened with mmap_mode="r", so loading is
+zero-copy and only the pages actually touched are read.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from eda_utils import cast_ids, iter_play_events, normalize_name
+
+SPEECH_STORE_DIR = "../speech_store"
+SPEECH_STORE_VERSION = 2
+
+_ARRAYS = {
+    # per speech
+    "speech_play": np.int32,
+    "speech_act": np.int16,
+    "speech_scene": np.int16,
+    "speech_first_line": np.int64,   # index into the line arrays
+    "speech_n_lines": np.int32,
+    "speech_words": np.int32,        # the "Line Count" column of _speeches.csv
+    # per (speech, speaker)
+    "speaker_speech": np.int64,
+    "speaker_char": np.int32,
+    "speaker_char_id": np.int32,     # the "Character ID" column (per-play aliases.cast_ids)
+    # per line
+    "line_start": np.int64,          # byte offsets into text.bin
+    "line_end": np.int64,
+}
+
+
+def build_speech_store(sources, out_dir=SPEECH_STORE_DIR):
+    """
+    Build a SpeechStore from play sources (paths, files or parsed trees, as
+    accepted by eda_utils.iter_play_events) and write it to out_dir.
+    Uses the same filtering as extract_speeches_and_lines_by_scene.
+    """
+    cols = {name: [] for name in _ARRAYS}
+    titles = []
+    char_ids = {}
+    arena = bytearray()
+    n_lines = 0
+
+    for play_i, source in enumerate(sources):
+        title = "Unknown Play"
+        cast = set()
+        play_speakers = []
+        for event in iter_play_events(source):
+            if event[0] == "title":
+                title = event[1]
+                continue
+            if event[0] != "speech":
+                continue
+
+            _, act_i, scene_i, raw_speakers, raw_lines = event
+            if act_i is None or scene_i is None:
+                continue
+
+            speakers = [normalize_name(s) for s in raw_speakers if s]
+            lines = [l.strip() for l in raw_lines if l and l.strip()]
+            cast.update(speakers)
+            if not speakers or not lines:
+                continue
+
+            speech_i = len(cols["speech_play"])
+            cols["speech_play"].append(play_i)
+            cols["speech_act"].append(act_i)
+            cols["speech_scene"].append(scene_i)
+            cols["speech_first_line"].append(n_lines)
+            cols["speech_n_lines"].append(len(lines))
+            cols["speech_words"].append(sum(len(l.split()) for l in lines))
+
+            for speaker in speakers:
+                cols["speaker_speech"].append(speech_i)
+                cols["speaker_char"].append(char_ids.setdefault(speaker, len(char_ids)))
+                play_speakers.append(speaker)
+
+            for line in lines:
+                cols["line_start"].append(len(arena))
+                arena += line.encode("utf-8")
+                cols["line_end"].append(len(arena))
+                arena += b" "
+            n_lines += len(lines)
+
+        ids = cast_ids(cast)
+        cols["speaker_char_id"].extend(ids.get(speaker, -1) for speaker in play_speakers)
+        titles.append(title)
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, dtype in _ARRAYS.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), np.asarray(cols[name], dtype=dtype))
+    with open(os.path.join(out_dir, "text.bin"), "wb") as fh:
+        fh.write(arena)
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump({
+            "version": SPEECH_STORE_VERSION,
+            "plays": titles,
+            "characters": list(char_ids),
+        }, fh, ensure_ascii=False)
+
+    return SpeechStore.open(out_dir)
+
+
+class SpeechStore:
+    """Read side of the compact format; see the module docstring for the layout."""
+
+    def __init__(self, path, meta, arrays, text):
+        self.path = path
+        self.plays = meta["plays"]
+        self.characters = meta["characters"]
+        self.text = text
+        for name, arr in arrays.items():
+            setattr(self, name, arr)
+
+    @classmethod
+    def open(cls, path=SPEECH_STORE_DIR):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("version") != SPEECH_STORE_VERSION:
+            raise ValueError(f"{path} was written by a different SpeechStore version; rebuild it.")
+
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in _ARRAYS
+        }
+        text_path = os.path.join(path, "text.bin")
+        if os.path.getsize(text_path):
+            text = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            text = np.zeros(0, dtype=np.uint8)
+        return cls(path, meta, arrays, text)
+
+    def __len__(self):
+        return len(self.speech_play)
+
+    @property
+    def n_lines(self):
+        return len(self.line_start)
+
+    def _decode(self, start, end):
+        return self.text[start:end].tobytes().decode("utf-8")
+
+    def line_text(self, line_i) -> str:
+        return self._decode(self.line_start[line_i], self.line_end[line_i])
+
+    def speech_text(self, speech_i) -> str:
+        first = self.speech_first_line[speech_i]
+        last = first + self.speech_n_lines[speech_i] - 1
+        return self._decode(self.line_start[first], self.line_end[last])
+
+    def play_code(self, title) -> int:
+        return self.plays.index(title)
+
+    def _speaker_rows(self, play):
+        """Indices into the speaker table, optionally limited to one play."""
+        if play is None:
+            return np.arange(len(self.speaker_speech))
+        play_i = play if isinstance(play, (int, np.integer)) else self.play_code(play)
+        return np.flatnonzero(np.asarray(self.speech_play)[self.speaker_speech] == play_i)
+
+    def speeches_frame(self, play=None) -> pd.DataFrame:
+        """Speech rows in the _speeches.csv layout (one row per speaker)."""
+        rows = self._speaker_rows(play)
+        speech = np.asarray(self.speaker_speech)[rows]
+        texts = {i: self.speech_text(i) for i in np.unique(speech).tolist()}
+        return pd.DataFrame({
+            "Play": np.asarray(self.plays, dtype=object)[np.asarray(self.speech_play)[speech]],
+            "Act": np.asarray(self.speech_act)[speech].astype(np.int64),
+            "Scene": np.asarray(self.speech_scene)[speech].astype(np.int64),
+            "Character": np.asarray(self.characters, dtype=object)[np.asarray(self.speaker_char)[rows]],
+            "Line Count": np.asarray(self.speech_words)[speech].astype(np.int64),
+            "Text": [texts[i] for i in speech.tolist()],
+            "Character ID": np.asarray(self.speaker_char_id)[rows].astype(np.int64),
+        })
+
+    def lines_frame(self, play=None) -> pd.DataFrame:
+        """Line rows in the _lines.csv layout (each line repeated per co-speaker)."""
+        rows = self._speaker_rows(play)
+        speech = np.asarray(self.speaker_speech)[rows]
+        counts = np.asarray(self.speech_n_lines)[speech].astype(np.int64)
+
+        row_speech = np.repeat(speech, counts)
+        row_char = np.repeat(np.asarray(self.speaker_char)[rows], counts)
+        row_char_id = np.repeat(np.asarray(self.speaker_char_id)[rows], counts)
+        # position of each output row inside its speech, 0-based
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        line_i = np.asarray(self.speech_first_line)[row_speech] + offsets
+
+        texts = {i: self.line_text(i) for i in np.unique(line_i).tolist()}
+        return pd.DataFrame({
+            "Play": np.asarray(self.plays, dtype=object)[np.asarray(self.speech_play)[row_speech]],
+            "Act": np.asarray(self.speech_act)[row_speech].astype(np.int64),
+            "Scene": np.asarray(self.speech_scene)[row_speech].astype(np.int64),
+            "Character": np.asarray(self.characters, dtype=object)[row_char],
+            "Line Number": offsets + 1,
+            "Text": [texts[i] for i in line_i.tolist()],
+            "Character ID": row_char_id.astype(np.int64),
+        })
@@ -0,0 +1,182 @@
+"""
+Stylometric features per character from the _lines.csv corpus.
+
+The whole corpus is tokenized in one pass: every line's text is joined
+into a single lowercased byte string, one regex scan splits it into words
+(same rule as line_index: apostrophes kept inside words), "?" / "!" marks
+and line breaks, and pd.factorize turns the tokens into integer codes.
+From there every feature is a np.bincount over (character, code) keys, so
+no Python loop runs per line or per token.
+
+Per (play, character):
+
+    n_tokens            words spoken
+    type_token_ratio    distinct words / words
+    mean_word_length    characters per word (apostrophes included)
+    question_rate       "?" per line
+    exclamation_rate    "!" per line
+    thou_you_ratio      thou/thee/thy/thine/thyself among all second-person forms
+    i_we_ratio          I/me/my/mine/myself among all first-person forms
+    fw_<word>           share of the words that are that FUNCTION_WORDS entry
+
+    python stylometry.py
+"""
+import argparse
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+STYLOMETRY_TABLE_PATH = "../csv/all_plays_stylometry.csv"
+
+FUNCTION_WORDS = [
+    "the", "and", "i", "to", "of", "a", "you", "my", "that", "in",
+    "is", "not", "it", "me", "with", "for", "be", "your", "this", "but",
+    "he", "have", "so", "what", "will", "as", "all", "no", "shall", "if",
+]
+PRONOUNS = {
+    "thou": ["thou", "thee", "thy", "thine", "thyself"],
+    "you": ["you", "your", "yours", "ye", "yourself"],
+    "i": ["i", "me", "my", "mine", "myself"],
+    "we": ["we", "us", "our", "ours", "ourselves"],
+}
+STYLOMETRY_COLUMNS = [
+    "n_tokens", "type_token_ratio", "mean_word_length", "question_rate", "exclamation_rate",
+    "thou_you_ratio", "i_we_ratio", *(f"fw_{w}" for w in FUNCTION_WORDS),
+]
+
+# words, the two marks, and the row separator
+_TOKEN_RE = re.compile(rb"[a-z]+(?:'[a-z]+)*|[?!\n]")
+
+
+def _safe_div(num, den):
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def tokenize_corpus(texts):
+    """
+    (row of each token, token codes, vocab) for a sequence of texts; vocab
+    holds the distinct tokens as bytes, codes index into it. "?", "!" are
+    tokens of their own.
+    """
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str).tolist()
+    blob = "\n".join(texts)
+    if blob.count("\n") != max(len(texts) - 1, 0):
+        # a text with its own line breaks would shift every row after it
+        blob = "\n".join(t.replace("\n", " ") for t in texts)
+    blob = blob.lower().encode("utf-8")
+    codes, vocab = pd.factorize(pd.Series(_TOKEN_RE.findall(blob), dtype=object))
+    newline = np.flatnonzero(vocab == b"\n")
+    is_break = codes == newline[0] if len(newline) else np.zeros(len(codes), dtype=bool)
+    rows = np.cumsum(is_break)[~is_break]
+    return rows, codes[~is_break], np.asarray(vocab, dtype=object)
+
+
+def _lookup(vocab, words):
+    """vocab-sized array: column of each vocab entry in `words`, -1 elsewhere."""
+    column = {w.encode(): i for i, w in enumerate(words)}
+    return np.fromiter((column.get(v, -1) for v in vocab), dtype=np.int64, count=len(vocab))
+
+
+def _grouped_counts(groups, cols, n_groups, n_cols):
+    """n_groups x n_cols counts of the (group, col) pairs with col >= 0."""
+    keep = cols >= 0
+    flat = np.bincount(groups[keep] * n_cols + cols[keep], minlength=n_groups * n_cols)
+    return flat.reshape(n_groups, n_cols)
+
+
+def character_stylometry(lines_df) -> pd.DataFrame:
+    """One row per (play, character) of a _lines.csv-layout table with the STYLOMETRY_COLUMNS."""
+    keys = lines_df[["Play", "Character"]].astype(str)
+    row_group = keys.groupby(["Play", "Character"], sort=True).ngroup().to_numpy()
+    index = keys.drop_duplicates().sort_values(["Play", "Character"]).rename(
+        columns={"Play": "play", "Character": "character"}
+    ).reset_index(drop=True)
+    n_groups = len(index)
+
+    rows, codes, vocab = tokenize_corpus(lines_df["Text"])
+    groups = row_group[rows]
+    n_vocab = len(vocab)
+
+    marks = _lookup(vocab, ["?", "!"])
+    is_word = marks[codes] < 0
+    mark_counts = _grouped_counts(groups, marks[codes], n_groups, 2)
+    n_lines = np.bincount(row_group, minlength=n_groups)
+
+    word_groups, word_codes = groups[is_word], codes[is_word]
+    n_tokens = np.bincount(word_groups, minlength=n_groups)
+    lengths = np.fromiter((len(v) for v in vocab), dtype=np.int64, count=n_vocab)
+    length_sum = np.bincount(word_groups, weights=lengths[word_codes], minlength=n_groups)
+    pairs = pd.unique(word_groups.astype(np.int64) * n_vocab + word_codes)
+    n_types = np.bincount(pairs // n_vocab, minlength=n_groups)
+
+    fw = _grouped_counts(word_groups, _lookup(vocab, FUNCTION_WORDS)[word_codes], n_groups, len(FUNCTION_WORDS))
+    forms = [w for ws in PRONOUNS.values() for w in ws]
+    person = np.repeat(np.arange(len(PRONOUNS)), [len(ws) for ws in PRONOUNS.values()])
+    form_col = _lookup(vocab, forms)[word_codes]
+    pron = _grouped_counts(word_groups, np.where(form_col >= 0, person[form_col], -1), n_groups, len(PRONOUNS))
+    thou, you, i, we = pron.T
+
+    features = pd.DataFrame({
+        "n_tokens": n_tokens,
+        "type_token_ratio": _safe_div(n_types, n_tokens),
+        "mean_word_length": _safe_div(length_sum, n_tokens),
+        "question_rate": _safe_div(mark_counts[:, 0], n_lines),
+        "exclamation_rate": _safe_div(mark_counts[:, 1], n_lines),
+        "thou_you_ratio": _safe_div(thou, thou + you),
+        "i_we_ratio": _safe_div(i, i + we),
+    })
+    fw_share = pd.DataFrame(_safe_div(fw, n_tokens[:, None]), columns=[f"fw_{w}" for w in FUNCTION_WORDS])
+    out = pd.concat([index, features, fw_share], axis=1)
+    out[STYLOMETRY_COLUMNS[1:]] = out[STYLOMETRY_COLUMNS[1:]].round(4)
+    return out
+
+
+def load_lines(csv_dir="../csv") -> pd.DataFrame:
+    """Every play's _lines.csv stacked into one table (only the columns used here)."""
+    paths = sorted(glob.glob(os.path.join(csv_dir, "*_lines.csv")))
+    frames = [pd.read_csv(p, usecols=["Play", "Character", "Text"], keep_default_na=False) for p in paths]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["Play", "Character", "Text"])
+
+
+def stylometry_table(csv_dir="../csv", out_path=STYLOMETRY_TABLE_PATH) -> pd.DataFrame:
+    """
+    Stylometric features for every character in csv_dir's _lines.csv files,
+    saved to out_path (pass out_path=None to skip writing).
+    """
+    table = character_stylometry(load_lines(csv_dir))
+    if out_path:
+        table.to_csv(out_path, index=False)
+        print(f"Saved stylometry table: {out_path}")
+    return table
+
+
+def add_stylometry_features(char_df, table=None, csv_dir="../csv") -> pd.DataFrame:
+    """
+    Left-join the STYLOMETRY_COLUMNS onto a character table keyed by (play,
+    character), replacing any already there. Characters without lines get 0.
+    """
+    if table is None:
+        table = stylometry_table(csv_dir, out_path=None)
+    out = char_df.drop(columns=[c for c in STYLOMETRY_COLUMNS if c in char_df.columns])
+    out = out.merge(table, on=["play", "character"], how="left")
+    out[STYLOMETRY_COLUMNS] = out[STYLOMETRY_COLUMNS].fillna(0)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv-dir", default="../csv")
+    parser.add_argument("--out", default=STYLOMETRY_TABLE_PATH)
+    args = parser.parse_args(argv)
+    stylometry_table(args.csv_dir, out_path=args.out)
+
+
+if __name__ == "__main__":
+    main()